@@ -1,32 +1,56 @@
 # app/api/endpoints/admin.py
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Request
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
-from sqlalchemy.orm import Session
 from pathlib import Path
+from typing import Any, Dict
 
-from app.db.session import get_db
-from app.models.product import Product
+from app.db.instrumentation import endpoint_metrics, pool_status
+from app.db.session import async_engine, engine
+from app.services.affiliate_clients.base import AffiliateClientBase
+from app.services.cache import cache
+from app.services.http_pool import http_clients
+from app.services.stats_service import get_affiliate_stats, summarize_stats
+from app.services.sync_scheduler import sync_scheduler
+from app.services.vector_index import vector_index
 
 router = APIRouter()
 
 templates = Jinja2Templates(directory=Path(__file__).parent.parent.parent / "templates")
 
 @router.get("/", response_class=HTMLResponse)
-async def affiliate_dashboard(request: Request, db: Session = Depends(get_db)):
+async def affiliate_dashboard(request: Request):
     """
     Dashboard para gerenciamento de links de afiliado.
     """
+    summary = summarize_stats(await get_affiliate_stats())
     stats = {
-        "total_products": db.query(Product).count(),
-        "with_affiliate": db.query(Product).filter(Product.affiliate_url != None).count(),
-        "without_affiliate": db.query(Product).filter(Product.affiliate_url == None).count(),
+        "total_products": summary["total_products"],
+        "with_affiliate": summary["with_affiliate_url"],
+        "without_affiliate": summary["without_affiliate_url"],
+        "coverage": summary["coverage_percentage"],
     }
-
-
-    stats["coverage"] = round((stats["with_affiliate"] / stats["total_products"] * 100) if stats["total_products"] > 0 else 0, 2)
     
     return templates.TemplateResponse(
         "affiliate_dashboard.html",
         {"request": request, "stats": stats}
-    )
\ No newline at end of file
+    )
+
+@router.get("/metrics", response_model=Dict[str, Any])
+async def get_metrics():
+    """
+    Métricas internas do processo (pools de conexão HTTP e do banco, uso do
+    banco por endpoint, cache, single-flight, agendador de sincronização e índice vetorial).
+    """
+    return {
+        "db_pools": {
+            "sync": pool_status(engine),
+            "async": pool_status(async_engine.sync_engine),
+        },
+        "db_endpoints": endpoint_metrics.stats(),
+        "http_pools": http_clients.stats(),
+        "cache": cache.stats(),
+        "single_flight": AffiliateClientBase.single_flight.stats(),
+        "sync_scheduler": sync_scheduler.stats(),
+        "vector_index": vector_index.stats(),
+    }
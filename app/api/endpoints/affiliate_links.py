@@ -1,252 +1,268 @@
 # app/api/endpoints/affiliate_links.py
-import csv
-import io
+import json
+import os
+import uuid
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, BackgroundTasks
-from sqlalchemy.orm import Session
-from sqlalchemy import func
 
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, keyset_paginate, split_page
+from app.db.session import get_async_db
 from app.models.product import Product
 from app.core.config import settings
+from app.services.affiliate_link_converter import SUPPORTED_PLATFORMS, convert_urls_async, is_conversion_configured
+from app.services.affiliate_link_import import REQUIRED_HEADERS, validate_headers
+from app.services.stats_service import (
+    get_affiliate_stats as get_affiliate_stats_by_platform,
+    summarize_stats,
+)
+from app.services.product_export import EXPORT_FORMATS, export_pending_products, parquet_available
+from app.worker.celery_app import get_job_status
+from app.worker.tasks import (
+    backfill_affiliate_links_job,
+    import_affiliate_links_file,
+    validate_affiliate_links as validate_affiliate_links_job,
+)
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Tamanho dos blocos lidos do upload
+UPLOAD_READ_SIZE = 1024 * 1024
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+def _check_conversion_platform(platform: str) -> None:
+    if platform not in SUPPORTED_PLATFORMS:
+        raise HTTPException(status_code=400, detail=f"Conversão não suportada para a plataforma: {platform}")
+    if not is_conversion_configured(platform):
+        raise HTTPException(
+            status_code=400,
+            detail=f"ID de afiliado não configurado para a plataforma: {platform} (app/core/affiliate_config.py)"
+        )
+
+def _parse_convert_body(body: bytes, ndjson: bool) -> List[str]:
+    # JSON: lista de URLs ou {"urls": [...]}; NDJSON: uma URL (string JSON ou {"url": ...}) por linha
+    if ndjson:
+        items = [json.loads(line) for line in body.splitlines() if line.strip()]
+    else:
+        items = json.loads(body or b"null")
+        if isinstance(items, dict):
+            items = items.get("urls")
+    if not isinstance(items, list):
+        raise ValueError("Esperada uma lista de URLs")
+    urls = [item.get("url") if isinstance(item, dict) else item for item in items]
+    if not all(isinstance(url, str) for url in urls):
+        raise ValueError("Cada item deve ser uma URL (string) ou um objeto com 'url'")
+    return urls
+
 @router.get("/pending/", response_model=Dict[str, Any])
 async def get_products_without_affiliate_links(
     platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
-    limit: int = Query(100, description="Número máximo de produtos a retornar"),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Número máximo de produtos a retornar"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (next_cursor da resposta anterior)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
-    Retorna produtos que não possuem links de afiliado.
+    Retorna produtos que não possuem links de afiliado, paginados por id.
+    
+    Use next_cursor para buscar a página seguinte (None na última página).
+    O total pendente é calculado apenas na primeira página.
     """
-    products = db.query(Product).filter(
-        Product.platform == platform,
-        Product.affiliate_url == None
-    ).limit(limit).all()
+    pending = (Product.platform == platform, Product.affiliate_url == None)
     
-    total_pending = db.query(func.count(Product.id)).filter(
-        Product.platform == platform,
-        Product.affiliate_url == None
-    ).scalar()
+    try:
+        stmt = keyset_paginate(select(Product).where(*pending), [Product.id], cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    products, next_cursor = split_page((await db.scalars(stmt)).all(), ["id"], limit)
+    
+    # Contar todo o backlog a cada página anularia o ganho da paginação por chave
+    total_pending = None
+    if cursor is None:
+        total_pending = await db.scalar(
+            select(func.count(Product.id)).where(*pending)
+        )
     
     return {
         "total_pending": total_pending,
         "returned_count": len(products),
+        "next_cursor": next_cursor,
         "products": products
     }
 
-@router.get("/export/", response_model=Dict[str, Any])
+@router.get("/export/")
 async def export_products_for_affiliate_links(
     platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
-    limit: int = Query(100, description="Número máximo de produtos a exportar"),
-    format: str = Query("csv", description="Formato de exportação (csv ou json)"),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, description="Número máximo de produtos a exportar (todos se omitido)"),
+    format: str = Query("csv", description="Formato de exportação (csv, ndjson, json ou parquet)"),
+    gzip: bool = Query(False, description="Compactar a exportação com gzip"),
 ):
     """
-    Exporta uma lista de produtos sem links de afiliado para processamento manual.
-    """
-    products = db.query(Product).filter(
-        Product.platform == platform,
-        Product.affiliate_url == None
-    ).limit(limit).all()
-    
-    if format.lower() == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["product_id", "external_id", "product_url"])
-        
-        for product in products:
-            writer.writerow([product.id, product.external_id, product.product_url])
-        
-        content = output.getvalue()
-        filename = f"{platform}_products_for_affiliate_{len(products)}.csv"
-        content_type = "text/csv"
+    Exporta os produtos sem links de afiliado para processamento manual.
     
-    elif format.lower() == "json":
-        content = [{"product_id": p.id, "external_id": p.external_id, "product_url": p.product_url} for p in products]
-        filename = f"{platform}_products_for_affiliate_{len(products)}.json"
-        content_type = "application/json"
-    
-    else:
+    O arquivo é gerado e enviado em blocos, lendo o banco com cursor do lado
+    do servidor, com uso de memória constante independentemente do volume.
+    """
+    format = format.lower()
+    if format not in EXPORT_FORMATS:
         raise HTTPException(status_code=400, detail=f"Formato não suportado: {format}")
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=400, detail="Exportação em Parquet requer o pacote 'pyarrow'")
     
-    return {
-        "filename": filename,
-        "content_type": content_type,
-        "content": content,
-        "count": len(products)
-    }
+    filename = f"{platform}_products_for_affiliate.{format}"
+    if gzip:
+        filename += ".gz"
+    
+    return StreamingResponse(
+        export_pending_products(platform, format, limit=limit, compress=gzip),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 @router.post("/import/", response_model=Dict[str, Any])
 async def import_affiliate_links(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db)
 ):
     """
     Importa links de afiliado gerados manualmente e atualiza os produtos.
-    Espera um arquivo CSV com as colunas: product_id, affiliate_url
+    Espera um arquivo CSV (ou CSV compactado com gzip) com as colunas: product_id, affiliate_url
+    
+    O arquivo é salvo em UPLOAD_DIR e processado por um worker; acompanhe em
+    /import/{import_id} ou /jobs/{import_id}.
     """
-    if not file.filename.endswith('.csv'):
-        raise HTTPException(status_code=400, detail="Apenas arquivos CSV são suportados")
+    if not file.filename.endswith(('.csv', '.csv.gz')):
+        raise HTTPException(status_code=400, detail="Apenas arquivos CSV (.csv ou .csv.gz) são suportados")
+    
+    import_id = uuid.uuid4().hex
+    path = os.path.join(settings.UPLOAD_DIR, f"affiliate_links_{import_id}.csv")
     
     try:
-        contents = await file.read()
-        decoded_contents = contents.decode("utf-8")
-        reader = csv.DictReader(io.StringIO(decoded_contents))
+        # Copia o upload em blocos para o diretório compartilhado com os workers
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        with open(path, "wb") as target:
+            while chunk := await file.read(UPLOAD_READ_SIZE):
+                target.write(chunk)
         
         # Validar cabeçalhos
-        required_headers = ["product_id", "affiliate_url"]
-        headers = reader.fieldnames
-        
-        if not all(header in headers for header in required_headers):
+        with open(path, "rb") as saved:
+            headers = validate_headers(saved)
+        if headers is None:
+            os.remove(path)
             raise HTTPException(
                 status_code=400, 
-                detail=f"Cabeçalhos obrigatórios não encontrados. Esperado: {required_headers}"
+                detail=f"Cabeçalhos obrigatórios não encontrados. Esperado: {REQUIRED_HEADERS}"
             )
         
-        # Processar em segundo plano para arquivos grandes
-        background_tasks.add_task(
-            process_affiliate_links,
-            decoded_contents=decoded_contents,
-            db=db
-        )
+        # Processar no worker, usando o ID da importação como ID do job
+        import_affiliate_links_file.apply_async(args=[path], task_id=import_id)
         
         return {
             "message": "Processamento iniciado em segundo plano",
-            "status": "processing"
+            "status": "processing",
+            "import_id": import_id
         }
-        
+    
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Erro ao processar arquivo: {e}")
+        if os.path.exists(path):
+            os.remove(path)
         raise HTTPException(status_code=500, detail=f"Erro ao processar arquivo: {str(e)}")
 
-async def process_affiliate_links(decoded_contents: str, db: Session):
-    """
-    Processa os links de afiliado em segundo plano.
-    """
-    reader = csv.DictReader(io.StringIO(decoded_contents))
-    updated_count = 0
-    errors = []
-    
-    try:
-        for row in reader:
-            try:
-                product_id = int(row["product_id"])
-                affiliate_url = row["affiliate_url"]
-                
-                # Validar URL de afiliado
-                if not is_valid_affiliate_url(affiliate_url):
-                    errors.append(f"URL de afiliado inválida para o produto {product_id}: {affiliate_url}")
-                    continue
-                
-                # Atualizar produto
-                product = db.query(Product).filter(Product.id == product_id).first()
-                if product:
-                    product.affiliate_url = affiliate_url
-                    db.add(product)
-                    updated_count += 1
-                else:
-                    errors.append(f"Produto não encontrado: {product_id}")
-            
-            except Exception as e:
-                errors.append(f"Erro ao processar linha: {row} - Erro: {str(e)}")
-        
-        # Commit das alterações
-        db.commit()
-        
-        # Registrar resultados
-        logger.info(f"Processamento concluído: {updated_count} produtos atualizados, {len(errors)} erros")
-        
-    except Exception as e:
-        db.rollback()
-        logger.error(f"Erro durante o processamento em lote: {e}")
-
-def is_valid_affiliate_url(url: str) -> bool:
+@router.get("/import/{import_id}", response_model=Dict[str, Any])
+async def get_import_status(import_id: str):
     """
-    Valida se a URL parece ser um link de afiliado válido do Mercado Livre.
+    Retorna o progresso de uma importação de links de afiliado.
     """
-    # Verificação básica para links de afiliado do Mercado Livre
-    # Ajuste conforme necessário com base nos padrões reais
-    valid_patterns = [
-        "mercadolivre.com.br/social/",
-        "mercadolivre.com.br/link/redirect",
-        "mercadolibre.com/social/",
-        "mercadolibre.com/link/redirect"
-    ]
-    
-    return any(pattern in url for pattern in valid_patterns)
+    status = await run_in_threadpool(get_job_status, import_id)
+    return {"import_id": import_id, **status}
 
 @router.get("/stats/", response_model=Dict[str, Any])
 async def get_affiliate_stats(
     platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
-    db: Session = Depends(get_db)
 ):
     """
     Retorna estatísticas sobre os links de afiliado.
     """
-    total_products = db.query(func.count(Product.id)).filter(
-        Product.platform == platform
-    ).scalar()
-    
-    with_affiliate = db.query(func.count(Product.id)).filter(
-        Product.platform == platform,
-        Product.affiliate_url != None
-    ).scalar()
-    
-    without_affiliate = db.query(func.count(Product.id)).filter(
-        Product.platform == platform,
-        Product.affiliate_url == None
-    ).scalar()
-    
-    return {
-        "platform": platform,
-        "total_products": total_products,
-        "with_affiliate_url": with_affiliate,
-        "without_affiliate_url": without_affiliate,
-        "coverage_percentage": round((with_affiliate / total_products * 100) if total_products > 0 else 0, 2)
-    }
+    stats = await get_affiliate_stats_by_platform()
+    return {"platform": platform, **summarize_stats(stats, platform)}
 
 @router.post("/validate/", response_model=Dict[str, Any])
 async def validate_affiliate_links(
-    background_tasks: BackgroundTasks,
     platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
-    db: Session = Depends(get_db)
 ):
     """
     Valida os links de afiliado existentes e marca os inválidos para atualização.
     """
-    background_tasks.add_task(
-        validate_affiliate_links_task,
-        platform=platform,
-        db=db
-    )
+    job = validate_affiliate_links_job.delay(platform)
     
     return {
         "message": "Validação de links iniciada em segundo plano",
-        "status": "processing"
+        "status": "processing",
+        "job_id": job.id
     }
 
-async def validate_affiliate_links_task(platform: str, db: Session):
+@router.post("/convert/")
+async def convert_affiliate_links(
+    request: Request,
+    platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
+):
     """
-    Tarefa em segundo plano para validar links de afiliado.
+    Converte um lote de URLs de produtos em links de afiliado, sem chamar a API.
+    
+    Aceita JSON (lista de URLs ou {"urls": [...]}) ou NDJSON (uma URL por
+    linha, como string JSON ou {"url": ...}). A resposta segue o formato da
+    requisição, na mesma ordem; affiliate_url é null quando a URL não pôde
+    ser convertida. Lotes grandes são processados em um pool de processos.
     """
-    products = db.query(Product).filter(
-        Product.platform == platform,
-        Product.affiliate_url != None
-    ).all()
+    _check_conversion_platform(platform)
+    
+    ndjson = request.headers.get("content-type", "").split(";")[0].strip() in NDJSON_MEDIA_TYPES
+    try:
+        urls = _parse_convert_body(await request.body(), ndjson)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Corpo inválido: {e}")
+    if len(urls) > settings.AFFILIATE_CONVERT_MAX_URLS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Máximo de {settings.AFFILIATE_CONVERT_MAX_URLS} URLs por requisição; use /backfill/ para o catálogo"
+        )
     
-    invalid_count = 0
+    links = await convert_urls_async(urls, platform)
+    results = [{"url": url, "affiliate_url": link} for url, link in zip(urls, links)]
+    
+    if ndjson:
+        content = "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+        return Response(content=content, media_type="application/x-ndjson")
+    
+    return {
+        "platform": platform,
+        "total": len(results),
+        "converted": sum(1 for link in links if link),
+        "results": results
+    }
+
+@router.post("/backfill/", response_model=Dict[str, Any])
+async def backfill_affiliate_links(
+    platform: str = Query("mercadolivre", description="Plataforma de afiliados"),
+):
+    """
+    Gera os links de afiliado de todos os produtos pendentes em segundo plano.
+    """
+    _check_conversion_platform(platform)
     
-    for product in products:
-        if not is_valid_affiliate_url(product.affiliate_url):
-            product.affiliate_url = None
-            db.add(product)
-            invalid_count += 1
+    job = backfill_affiliate_links_job.delay(platform)
     
-    db.commit()
-    logger.info(f"Validação concluída: {invalid_count} links inválidos encontrados e marcados para atualização")
\ No newline at end of file
+    return {
+        "message": "Geração de links de afiliado iniciada em segundo plano",
+        "status": "processing",
+        "job_id": job.id
+    }
@@ -1,55 +1,72 @@
 # app/api/endpoints/affiliate_stores.py
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError, keyset_paginate, split_page
+from app.db.session import get_async_db
 from app.models.affiliate_store import AffiliateStore
 from app.schemas.affiliate_store import AffiliateStoreCreate, AffiliateStoreUpdate, AffiliateStoreInDB
+from app.services.store_registry import store_registry
 
 router = APIRouter()
 
 @router.post("/", response_model=AffiliateStoreInDB)
-def create_affiliate_store(
+async def create_affiliate_store(
     store: AffiliateStoreCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create a new affiliate store."""
     db_store = AffiliateStore(**store.model_dump())
     db.add(db_store)
-    db.commit()
-    db.refresh(db_store)
+    await db.commit()
+    await db.refresh(db_store)
+    await store_registry.invalidate()
     return db_store
 
 @router.get("/", response_model=List[AffiliateStoreInDB])
-def read_affiliate_stores(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def read_affiliate_stores(
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (cabeçalho X-Next-Cursor)"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all affiliate stores."""
-    stores = db.query(AffiliateStore).offset(skip).limit(limit).all()
+    """
+    Get affiliate stores, paginated by id.
+    
+    The cursor for the next page is returned in the X-Next-Cursor header
+    (absent on the last page).
+    """
+    try:
+        stmt = keyset_paginate(select(AffiliateStore), [AffiliateStore.id], cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    stores, next_cursor = split_page((await db.scalars(stmt)).all(), ["id"], limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return stores
 
 @router.get("/{store_id}", response_model=AffiliateStoreInDB)
-def read_affiliate_store(
+async def read_affiliate_store(
     store_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific affiliate store."""
-    db_store = db.query(AffiliateStore).filter(AffiliateStore.id == store_id).first()
+    db_store = await db.get(AffiliateStore, store_id)
     if db_store is None:
         raise HTTPException(status_code=404, detail="Affiliate store not found")
     return db_store
 
 @router.put("/{store_id}", response_model=AffiliateStoreInDB)
-def update_affiliate_store(
+async def update_affiliate_store(
     store_id: int,
     store: AffiliateStoreUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update an affiliate store."""
-    db_store = db.query(AffiliateStore).filter(AffiliateStore.id == store_id).first()
+    db_store = await db.get(AffiliateStore, store_id)
     if db_store is None:
         raise HTTPException(status_code=404, detail="Affiliate store not found")
     
@@ -58,20 +75,22 @@ def update_affiliate_store(
         setattr(db_store, key, value)
     
     db.add(db_store)
-    db.commit()
-    db.refresh(db_store)
+    await db.commit()
+    await db.refresh(db_store)
+    await store_registry.invalidate()
     return db_store
 
 @router.delete("/{store_id}", response_model=AffiliateStoreInDB)
-def delete_affiliate_store(
+async def delete_affiliate_store(
     store_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete an affiliate store."""
-    db_store = db.query(AffiliateStore).filter(AffiliateStore.id == store_id).first()
+    db_store = await db.get(AffiliateStore, store_id)
     if db_store is None:
         raise HTTPException(status_code=404, detail="Affiliate store not found")
     
-    db.delete(db_store)
-    db.commit()
+    await db.delete(db_store)
+    await db.commit()
+    await store_registry.invalidate()
     return db_store
\ No newline at end of file
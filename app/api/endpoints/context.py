@@ -0,0 +1,46 @@
+# app/api/endpoints/context.py
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.db.session import get_async_db
+from app.services.context_service import get_context_documents, pack_context
+from app.services.embedding_service import semantic_search
+
+router = APIRouter()
+
+@router.get("/products/")
+async def get_product_context(
+    q: Optional[str] = Query(None, min_length=2, description="Consulta (busca semântica local)"),
+    ids: Optional[List[int]] = Query(None, description="IDs dos produtos, na ordem desejada"),
+    limit: int = Query(20, ge=1, le=100, description="Número máximo de produtos"),
+    max_tokens: int = Query(settings.CONTEXT_MAX_TOKENS, ge=50, le=32000, description="Orçamento de tokens do contexto"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Contexto compacto de produtos para agentes de IA (estilo MCP).
+
+    Os documentos são pré-calculados na sincronização e lidos com um único
+    MGET; a resposta é montada por concatenação, sem validação por produto.
+    """
+    if not q and not ids:
+        raise HTTPException(status_code=400, detail="Informe 'q' ou 'ids'")
+
+    if ids:
+        product_ids = list(dict.fromkeys(ids))[:limit]
+    else:
+        matches = await run_in_threadpool(semantic_search, q, limit)
+        product_ids = [product_id for product_id, _ in matches]
+
+    documents = await get_context_documents(db, product_ids)
+    products, tokens, truncated = pack_context(documents, max_tokens)
+
+    # Documentos já estão serializados: monta o JSON final sem revalidar
+    body = (
+        f'{{"products":{products},"tokens":{tokens},'
+        f'"truncated":{"true" if truncated else "false"}}}'
+    )
+    return Response(content=body, media_type="application/json")
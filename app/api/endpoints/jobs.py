@@ -0,0 +1,20 @@
+# app/api/endpoints/jobs.py
+from typing import Any, Dict
+
+from fastapi import APIRouter
+from starlette.concurrency import run_in_threadpool
+
+from app.worker.celery_app import get_job_status
+
+router = APIRouter()
+
+@router.get("/{job_id}", response_model=Dict[str, Any])
+async def get_job(job_id: str):
+    """
+    Retorna o estado e o progresso de um job em segundo plano.
+    
+    Estados: PENDING (na fila ou desconhecido), STARTED, PROGRESS, RETRY,
+    SUCCESS ou FAILURE.
+    """
+    # O backend de resultados é consultado de forma síncrona
+    return await run_in_threadpool(get_job_status, job_id)
@@ -1,12 +1,20 @@
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.product import Product
-from app.schemas.product import Product as ProductSchema, ProductCreate, ProductUpdate
+from app.schemas.product import Product as ProductSchema, ProductCreate, ProductSearchResult, ProductUpdate
+from app.core.config import settings
+from app.services.affiliate_clients import get_affiliate_client
 from app.services.affiliate_service import AffiliateService
+from app.services.embedding_service import semantic_search
+from app.services.product_search import SEARCH_MODES, search_local_products, search_similar_products
 
 router = APIRouter()
 
@@ -16,41 +24,98 @@ router = APIRouter()
 async def search_products_all_platforms(
     q: str = Query(..., min_length=2),
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
 ):
     """
     Busca produtos em todas as plataformas suportadas.
     """
-    affiliate_service = AffiliateService(db)
+    affiliate_service = AffiliateService()
     results = await affiliate_service.search_products_all_platforms(q, limit=limit)
     return results
 
+@router.get("/search/local/", response_model=List[ProductSchema])
+async def search_local(
+    q: str = Query(..., min_length=2),
+    mode: str = Query("fulltext", description="fulltext (por palavras) ou fuzzy (tolerante a erros de digitação no título)"),
+    threshold: Optional[float] = Query(None, ge=0, le=1, description="Similaridade mínima no modo fuzzy"),
+    platform: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    available: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Busca produtos no catálogo local (sem chamar as plataformas), ordenados por relevância.
+    """
+    if mode not in SEARCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Modo de busca não suportado: {mode}")
+    
+    filters = dict(
+        platform=platform,
+        category=category,
+        min_price=min_price,
+        max_price=max_price,
+        available=available,
+        limit=limit,
+        offset=offset,
+    )
+    if mode == "fuzzy":
+        return await search_similar_products(db, q, threshold=threshold, **filters)
+    return await search_local_products(db, q, **filters)
+
+# Declarado depois de /search/local/ para não capturar "local" como plataforma
 @router.get("/search/{platform}/", response_model=List[ProductSchema])
 async def search_products(
     platform: str,
     q: str = Query(..., min_length=2),
     category: Optional[str] = None,
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db),
 ):
     """
     Busca produtos em uma plataforma específica.
     """
-    affiliate_service = AffiliateService(db)
+    affiliate_service = AffiliateService()
     results = await affiliate_service.search_products(platform, q, category=category, limit=limit)
     return results
 
+@router.get("/search/{platform}/stream/")
+async def stream_search_products(
+    platform: str,
+    q: str = Query(..., min_length=2),
+    category: Optional[str] = None,
+    max_results: int = Query(500, ge=1, le=settings.ML_SEARCH_MAX_RESULTS),
+    page_size: int = Query(50, ge=1, le=50),
+):
+    """
+    Busca paginada em uma plataforma, retornando os produtos como NDJSON (um por linha)
+    à medida que as páginas chegam.
+    """
+    try:
+        client = get_affiliate_client(platform)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    async def generate():
+        async for product in client.search_products_paginated(
+            q, category=category, max_results=max_results, page_size=page_size
+        ):
+            yield product.model_dump_json() + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
 @router.get("/external/{platform}/{product_id}", response_model=ProductSchema)
 async def get_external_product(
     platform: str,
     product_id: str,
-    db: Session = Depends(get_db),
+    include_description: bool = Query(True, description="Buscar a descrição completa (chamada adicional)"),
 ):
     """
     Obtém detalhes de um produto externo específico.
     """
-    affiliate_service = AffiliateService(db)
-    product = await affiliate_service.get_product_details(platform, product_id)
+    affiliate_service = AffiliateService()
+    product = await affiliate_service.get_product_details(platform, product_id, include_description=include_description)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -58,15 +123,46 @@ async def get_external_product(
 @router.get("/categories/{platform}/", response_model=List[Dict[str, Any]])
 async def get_product_categories(
     platform: str,
-    db: Session = Depends(get_db),
 ):
     """
     Obtém as categorias de produtos disponíveis na plataforma.
     """
-    affiliate_service = AffiliateService(db)
+    affiliate_service = AffiliateService()
     categories = await affiliate_service.get_product_categories(platform)
     return categories
 
+@router.get("/semantic/", response_model=List[ProductSearchResult])
+async def search_semantic(
+    q: str = Query(..., min_length=2),
+    platform: Optional[str] = None,
+    available: Optional[bool] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Busca semântica no catálogo local (índice vetorial em disco, sem chamadas externas).
+    """
+    # Com filtros, busca mais candidatos para compensar os descartados
+    k = limit * 4 if platform or available is not None else limit
+    matches = await run_in_threadpool(semantic_search, q, k)
+    if not matches:
+        return []
+    
+    scores = dict(matches)
+    stmt = select(Product).where(Product.id.in_(scores))
+    if platform:
+        stmt = stmt.where(Product.platform == platform)
+    if available is not None:
+        stmt = stmt.where(Product.available == available)
+    products = (await db.scalars(stmt)).all()
+    
+    results = [
+        ProductSearchResult(**ProductSchema.model_validate(product).model_dump(), score=scores[product.id])
+        for product in products
+    ]
+    results.sort(key=lambda result: result.score, reverse=True)
+    return results[:limit]
+
 @router.get("/{product_id}", response_model=ProductSchema)
 def get_product(
     product_id: int,
@@ -2,12 +2,15 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any
 
+import httpx
+
 class BaseMarketplaceClient(ABC):
     """Base client for marketplace integrations."""
     
-    def __init__(self, credentials: Dict[str, str]):
-        """Initialize with API credentials."""
+    def __init__(self, credentials: Dict[str, str], http_client: Optional[httpx.AsyncClient] = None):
+        """Initialize with API credentials and a shared HTTP client."""
         self.credentials = credentials
+        self.http_client = http_client
     
     @abstractmethod
     async def search_products(self, query: str, category: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
@@ -20,7 +23,7 @@ class BaseMarketplaceClient(ABC):
         pass
     
     @abstractmethod
-    async def get_product_details(self, product_id: str) -> Dict[str, Any]:
+    async def get_product_details(self, product_id: str, include_description: bool = True) -> Dict[str, Any]:
         """Get detailed information about a specific product."""
         pass
     
\ No newline at end of file
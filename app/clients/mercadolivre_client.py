@@ -1,14 +1,16 @@
 # app/clients/mercadolivre_client.py
+import asyncio
 import httpx
 from typing import Dict, List, Optional, Any
 from app.clients.base_client import BaseMarketplaceClient
 from app.schemas.product import ProductCreate
+from app.services.http_pool import http_clients
 
 class MercadoLivreClient(BaseMarketplaceClient):
     """Client for Mercado Livre API."""
     
-    def __init__(self, credentials: Dict[str, str]):
-        super().__init__(credentials)
+    def __init__(self, credentials: Dict[str, str], http_client: Optional[httpx.AsyncClient] = None):
+        super().__init__(credentials, http_client or http_clients.get("mercadolivre"))
         self.base_url = "https://api.mercadolibre.com"
         self.access_token = credentials.get("access_token")
     
@@ -28,32 +30,30 @@ class MercadoLivreClient(BaseMarketplaceClient):
         if self.access_token:
             headers["Authorization"] = f"Bearer {self.access_token}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, params=params, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"HTTP error during search: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            products = []
-            
-            for item in data.get("results", []):
-                product = {
-                    "external_id": item.get("id"),
-                    "platform": "mercadolivre",
-                    "title": item.get("title"),
-                    "description": item.get("description", ""),
-                    "price": item.get("price"),
-                    "sale_price": item.get("original_price"),
-                    "image_url": item.get("thumbnail"),
-                    "product_url": item.get("permalink"),
-                    "category": item.get("category_id"),
-                    "brand": item.get("brand", {}).get("name", ""),
-                    "available": item.get("available_quantity", 0) > 0
-                }
-                products.append(product)
-            
-            return products
+        response = await self.http_client.get(url, params=params, headers=headers)
+        # httpx.HTTPStatusError: os jobs decidem se a falha merece nova tentativa
+        response.raise_for_status()
+        
+        data = response.json()
+        products = []
+        
+        for item in data.get("results", []):
+            product = {
+                "external_id": item.get("id"),
+                "platform": "mercadolivre",
+                "title": item.get("title"),
+                "description": item.get("description", ""),
+                "price": item.get("price"),
+                "sale_price": item.get("original_price"),
+                "image_url": item.get("thumbnail"),
+                "product_url": item.get("permalink"),
+                "category": item.get("category_id"),
+                "brand": item.get("brand", {}).get("name", ""),
+                "available": item.get("available_quantity", 0) > 0
+            }
+            products.append(product)
+        
+        return products
     
     async def generate_affiliate_link(self, product_url: str) -> str:
         """Generate an affiliate link for a Mercado Livre product."""
@@ -66,16 +66,15 @@ class MercadoLivreClient(BaseMarketplaceClient):
         headers = {"Authorization": f"Bearer {self.access_token}"}
         payload = {"url": product_url}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=payload, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"Error generating affiliate link: {response.status_code} - {response.text}")
-            
-            data = response.json()
-            return data.get("affiliate_url", product_url)
+        response = await self.http_client.post(url, json=payload, headers=headers)
+        
+        if response.status_code != 200:
+            raise Exception(f"Error generating affiliate link: {response.status_code} - {response.text}")
+        
+        data = response.json()
+        return data.get("affiliate_url", product_url)
     
-    async def get_product_details(self, product_id: str) -> Dict[str, Any]:
+    async def get_product_details(self, product_id: str, include_description: bool = True) -> Dict[str, Any]:
         """Get detailed information about a specific product."""
         url = f"{self.base_url}/items/{product_id}"
         
@@ -83,34 +82,37 @@ class MercadoLivreClient(BaseMarketplaceClient):
         if self.access_token:
             headers["Authorization"] = f"Bearer {self.access_token}"
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            
-            if response.status_code != 200:
-                raise Exception(f"Error getting product details: {response.status_code} - {response.text}")
-            
-            item = response.json()
-            
-            # Buscar descrição do produto
+        description_response = None
+        if include_description:
+            # Item e descrição são independentes: buscar em paralelo
             description_url = f"{self.base_url}/items/{product_id}/description"
-            description_response = await client.get(description_url, headers=headers)
-            description = ""
-            
-            if description_response.status_code == 200:
-                description = description_response.json().get("plain_text", "")
-            
-            product = {
-                "external_id": item.get("id"),
-                "platform": "mercadolivre",
-                "title": item.get("title"),
-                "description": description,
-                "price": item.get("price"),
-                "sale_price": item.get("original_price"),
-                "image_url": item.get("pictures", [{}])[0].get("url", item.get("thumbnail")),
-                "product_url": item.get("permalink"),
-                "category": item.get("category_id"),
-                "brand": item.get("attributes", [{}])[0].get("value_name", ""),
-                "available": item.get("available_quantity", 0) > 0
-            }
-            
-            return product
\ No newline at end of file
+            response, description_response = await asyncio.gather(
+                self.http_client.get(url, headers=headers),
+                self.http_client.get(description_url, headers=headers),
+            )
+        else:
+            response = await self.http_client.get(url, headers=headers)
+        
+        response.raise_for_status()
+        
+        item = response.json()
+        description = ""
+        
+        if description_response is not None and description_response.status_code == 200:
+            description = description_response.json().get("plain_text", "")
+        
+        product = {
+            "external_id": item.get("id"),
+            "platform": "mercadolivre",
+            "title": item.get("title"),
+            "description": description,
+            "price": item.get("price"),
+            "sale_price": item.get("original_price"),
+            "image_url": item.get("pictures", [{}])[0].get("url", item.get("thumbnail")),
+            "product_url": item.get("permalink"),
+            "category": item.get("category_id"),
+            "brand": item.get("attributes", [{}])[0].get("value_name", ""),
+            "available": item.get("available_quantity", 0) > 0
+        }
+        
+        return product
\ No newline at end of file
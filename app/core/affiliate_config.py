@@ -1,9 +1,12 @@
 from typing import Dict, Any
 
+# Valor de exemplo: enquanto não for substituído, nenhum link de afiliado é gerado
+PLACEHOLDER_AFFILIATE_ID = "YOUR_AFFILIATE_ID"
+
 # Configurações de afiliados
 AFFILIATE_CONFIG = {
     "mercadolivre": {
-        "affiliate_id": "YOUR_AFFILIATE_ID",  # Substitua pelo seu ID de afiliado
+        "affiliate_id": PLACEHOLDER_AFFILIATE_ID,  # Substitua pelo seu ID de afiliado
         "campaign": "casadigital",
         "platform": "ml"
     }
@@ -20,4 +23,17 @@ def get_affiliate_config(platform: str) -> Dict[str, Any]:
     Returns:
         Configuração de afiliado
     """
-    return AFFILIATE_CONFIG.get(platform, {})
\ No newline at end of file
+    return AFFILIATE_CONFIG.get(platform, {})
+
+def is_affiliate_id_configured(config: Dict[str, Any]) -> bool:
+    """
+    Verifica se a configuração tem um ID de afiliado real (e não o de exemplo).
+    
+    Args:
+        config: Configuração de afiliado de uma plataforma
+        
+    Returns:
+        True se o ID de afiliado estiver preenchido
+    """
+    affiliate_id = (config or {}).get("affiliate_id")
+    return bool(affiliate_id) and affiliate_id != PLACEHOLDER_AFFILIATE_ID
@@ -25,6 +25,18 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str
     DATABASE_URI: Optional[str] = None
     DATABASE_URL: str
+    # URL para o engine assíncrono (derivada de DATABASE_URL com asyncpg se omitida)
+    ASYNC_DATABASE_URL: Optional[str] = None
+
+    # Pool de conexões do banco (aplicado a cada engine, síncrono e assíncrono)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Modo de depuração (expõe métricas de banco por requisição nos headers)
+    DEBUG: bool = False
     
     @property
     def SQLALCHEMY_DATABASE_URI(self) -> str:
@@ -37,6 +49,108 @@ class Settings(BaseSettings):
     REDIS_PORT: int
     REDIS_DB: int
     REDIS_PASSWORD: Optional[str] = None
+    REDIS_MAX_CONNECTIONS: int = 50
+
+    @property
+    def REDIS_URL(self) -> str:
+        auth = f":{self.REDIS_PASSWORD}@" if self.REDIS_PASSWORD else ""
+        return f"redis://{auth}{self.REDIS_HOST}:{self.REDIS_PORT}/{self.REDIS_DB}"
+
+    # Fila de jobs (Celery); broker e resultados usam o Redis se omitidos
+    CELERY_BROKER_URL: Optional[str] = None
+    CELERY_RESULT_BACKEND: Optional[str] = None
+    WORKER_CONCURRENCY: int = 4
+    JOB_MAX_RETRIES: int = 3
+    JOB_RETRY_BACKOFF_MAX: int = 600
+    JOB_RESULT_TTL: int = 24 * 60 * 60
+    # Diretório compartilhado entre API e workers para arquivos enviados
+    UPLOAD_DIR: str = "/tmp/casa_digital_mcp/uploads"
+
+    # Cache local (L1) em memória na frente do Redis
+    CACHE_L1_ENABLED: bool = False
+    CACHE_L1_MAXSIZE: int = 10000
+    CACHE_L1_TTL: float = 30.0
+    # Janela (segundos) em que um valor expirado ainda é servido enquanto é revalidado
+    CACHE_STALE_TTL: int = 300
+
+    # TTLs (segundos) do cache das chamadas ao Mercado Livre
+    ML_CACHE_SEARCH_TTL: int = 300
+    ML_CACHE_DETAILS_TTL: int = 900
+    ML_CACHE_DESCRIPTION_TTL: int = 3600
+    ML_CACHE_CATEGORIES_TTL: int = 86400
+
+    # Busca paralela de detalhes em get_trending_products
+    ML_TRENDING_CONCURRENCY: int = 8
+    ML_TRENDING_ITEM_TIMEOUT: float = 10.0
+    ML_TRENDING_DEADLINE: float = 20.0
+
+    # Consulta em lote de itens (/items?ids=...)
+    ML_MULTIGET_BATCH_SIZE: int = 20
+    ML_MULTIGET_CONCURRENCY: int = 4
+
+    # Busca paginada (offset máximo aceito pela API pública de busca)
+    ML_SEARCH_MAX_RESULTS: int = 1000
+    ML_SEARCH_PAGE_CONCURRENCY: int = 4
+
+    # Sincronização de produtos
+    SYNC_UPSERT_CHUNK_SIZE: int = 1000
+
+    # Busca aproximada por título (pg_trgm): similaridade mínima de palavra (0 a 1)
+    SEARCH_FUZZY_THRESHOLD: float = 0.5
+
+    # Busca semântica local (embeddings por hashing + índice LSH em disco)
+    VECTOR_INDEX_ENABLED: bool = True
+    VECTOR_INDEX_DIR: str = "data/vector_index"
+    EMBEDDING_DIM: int = 1024
+    VECTOR_LSH_TABLES: int = 8
+    VECTOR_LSH_BITS: int = 12
+    # Índices menores que isto são pesquisados de forma exata (sem LSH)
+    VECTOR_EXACT_SEARCH_MAX: int = 50000
+    VECTOR_SCORE_BATCH_SIZE: int = 65536
+
+    # Documentos de contexto para agentes (pré-calculados na sincronização)
+    CONTEXT_DESCRIPTION_CHARS: int = 280
+    CONTEXT_DOC_TTL: int = 7 * 24 * 60 * 60
+    CONTEXT_MAX_TOKENS: int = 2000
+    CONTEXT_CHARS_PER_TOKEN: int = 4
+
+    # Agendador de sincronização (termos em app/core/sync_config.py)
+    SYNC_SCHEDULER_ENABLED: bool = False
+    SYNC_SCHEDULER_TICK: float = 60.0
+    SYNC_SCHEDULER_LEADER_TTL: int = 120
+
+    # Importação de links de afiliado
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_SPOOL_MAX_SIZE: int = 10 * 1024 * 1024
+    IMPORT_MAX_ERROR_SAMPLES: int = 100
+
+    # Conversão de links de afiliado em lote (/affiliate-links/convert/)
+    AFFILIATE_CONVERT_MAX_URLS: int = 100000
+    AFFILIATE_CONVERT_POOL_THRESHOLD: int = 20000  # a partir daqui, usa o pool de processos
+    AFFILIATE_CONVERT_CHUNK_SIZE: int = 10000
+    AFFILIATE_CONVERT_WORKERS: int = 0  # 0 = número de CPUs
+
+    # Exportação de produtos (linhas lidas por lote do cursor)
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Estatísticas de cobertura de links de afiliado (TTL do cache em segundos)
+    STATS_CACHE_TTL: int = 30
+
+    # Intervalo (segundos) entre verificações da versão do registro de lojas
+    REGISTRY_VERSION_CHECK_INTERVAL: float = 5.0
+
+    # Single-flight: agrupamento de requisições idênticas concorrentes às plataformas
+    SINGLE_FLIGHT_DISTRIBUTED: bool = False
+    SINGLE_FLIGHT_LOCK_TIMEOUT: float = 5.0
+    SINGLE_FLIGHT_RESULT_TTL: int = 5
+    SINGLE_FLIGHT_POLL_INTERVAL: float = 0.05
+
+    # HTTP (pool de conexões compartilhado por plataforma)
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_ENABLE_HTTP2: bool = False
 
     # Security
     SECRET_KEY: str
@@ -0,0 +1,136 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import BigInteger, Select, and_, or_
+
+# Limite padrão e máximo das páginas nas listagens
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado ou de outra listagem."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Tipo não suportado em cursores: {type(value).__name__}")
+
+
+def _decode_value(value: Any, column: Any) -> Any:
+    # Valida o valor contra o tipo da coluna antes de chegar ao banco
+    python_type = column.type.python_type
+    if python_type is int:
+        bits = 63 if isinstance(column.type, BigInteger) else 31
+        if isinstance(value, int) and not isinstance(value, bool) and -(1 << bits) <= value < (1 << bits):
+            return value
+    elif python_type is datetime:
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+    elif python_type is str:
+        # O PostgreSQL rejeita NUL em parâmetros de texto
+        if isinstance(value, str) and "\x00" not in value:
+            return value
+    elif isinstance(value, python_type) and not isinstance(value, bool):
+        return value
+    raise InvalidCursorError("Cursor inválido")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Codifica os valores da chave da última linha em um cursor opaco.
+
+    Args:
+        values: Valores das colunas de ordenação (JSON-serializáveis ou datetime)
+
+    Returns:
+        Cursor em base64 url-safe, sem padding
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=_encode_value).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Decodifica um cursor gerado por encode_cursor.
+
+    Args:
+        cursor: Cursor opaco
+        columns: Colunas de ordenação, cujos tipos validam os valores da chave
+
+    Returns:
+        Valores da chave
+
+    Raises:
+        InvalidCursorError: Se o cursor for inválido ou não corresponder às colunas
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursorError("Cursor inválido")
+    return [_decode_value(value, column) for value, column in zip(values, columns)]
+
+
+def keyset_paginate(
+    stmt: Select,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+) -> Select:
+    """
+    Aplica paginação por chave (keyset) a uma consulta.
+
+    Em vez de OFFSET, filtra as linhas posteriores à chave do cursor, de modo
+    que qualquer página custa o mesmo que a primeira (com um índice sobre as
+    colunas de ordenação). Busca uma linha a mais para saber se há próxima página.
+
+    Args:
+        stmt: Consulta base (sem ORDER BY/LIMIT)
+        columns: Colunas de ordenação crescente; a última deve ser única (ex.: id)
+        cursor: Cursor da página anterior (None para a primeira página)
+        limit: Tamanho da página
+
+    Returns:
+        Consulta ordenada, filtrada e limitada a limit + 1 linhas
+
+    Raises:
+        InvalidCursorError: Se o cursor for inválido
+    """
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y), sem depender de row values
+        conditions = []
+        for position, column in enumerate(columns):
+            equal = [columns[i] == values[i] for i in range(position)]
+            conditions.append(and_(*equal, column > values[position]))
+        stmt = stmt.where(or_(*conditions))
+    return stmt.order_by(*columns).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Any], keys: Sequence[str], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    Separa a página das linhas buscadas por keyset_paginate e gera o próximo cursor.
+
+    Args:
+        rows: Linhas retornadas (até limit + 1)
+        keys: Atributos das linhas com os valores das colunas de ordenação
+        limit: Tamanho da página
+
+    Returns:
+        Linhas da página e cursor da próxima página (None na última)
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor([getattr(last, key) for key in keys])
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Configuração declarativa da sincronização periódica de produtos.
+#
+# Cada plataforma define quantas buscas podem rodar ao mesmo tempo, o
+# intervalo padrão (segundos) entre sincronizações de um mesmo termo e os
+# grupos de termos. Grupos e termos podem sobrescrever `interval`,
+# `max_results` e `category`.
+SYNC_CONFIG: Dict[str, Dict[str, Any]] = {
+    "mercadolivre": {
+        "concurrency": 4,
+        "interval": 6 * 60 * 60,
+        "max_results": 200,
+        "groups": {
+            "Smartphones": {
+                "category": "MLB1051",
+                "interval": 3 * 60 * 60,
+                "terms": ["smartphone", "celular", "iphone", "samsung galaxy"],
+            },
+            "Notebooks": {
+                "category": "MLB1648",
+                "terms": ["notebook", "laptop", "macbook", "computador portatil"],
+            },
+            "TVs": {
+                "category": "MLB1000",
+                "terms": ["smart tv", "tv 4k", "televisor", "tv led"],
+            },
+            "Eletrodomésticos": {
+                "category": "MLB5726",
+                "terms": ["geladeira", "fogão", "microondas", "lava louças", "lava roupas"],
+            },
+            "Casa e Decoração": {
+                "interval": 12 * 60 * 60,
+                "terms": ["sofá", "mesa", "cadeira", "cama", "decoração"],
+            },
+            "Informática": {
+                "terms": ["monitor", "teclado", "mouse", "impressora", "ssd", "pendrive"],
+            },
+        },
+    },
+    # Adicione outras plataformas conforme necessário
+}
+
+
+@dataclass(frozen=True)
+class SyncTerm:
+    """Um termo de busca sincronizado periodicamente."""
+
+    platform: str
+    group: str
+    query: str
+    category: Optional[str]
+    interval: int
+    max_results: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.platform}:{self.query}:{self.category or ''}"
+
+
+def get_sync_terms(platform: Optional[str] = None) -> List[SyncTerm]:
+    """
+    Expande a configuração em uma lista de termos.
+
+    Termos podem ser strings ou dicionários com `query` e sobrescritas.
+
+    Args:
+        platform: Plataforma desejada (None para todas)
+
+    Returns:
+        Termos configurados
+    """
+    terms = []
+    for platform_name, config in SYNC_CONFIG.items():
+        if platform is not None and platform_name != platform:
+            continue
+        for group_name, group in config.get("groups", {}).items():
+            for term in group.get("terms", []):
+                if isinstance(term, str):
+                    term = {"query": term}
+                terms.append(SyncTerm(
+                    platform=platform_name,
+                    group=group_name,
+                    query=term["query"],
+                    category=term.get("category", group.get("category")),
+                    interval=term.get("interval", group.get("interval", config["interval"])),
+                    max_results=term.get("max_results", group.get("max_results", config["max_results"])),
+                ))
+    return terms
+
+
+def get_sync_concurrency(platform: str) -> int:
+    """
+    Obtém o número máximo de buscas simultâneas de uma plataforma.
+    """
+    return SYNC_CONFIG.get(platform, {}).get("concurrency", 1)
@@ -0,0 +1,186 @@
+# app/db/instrumentation.py
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+
+
+class QueryStats:
+    """
+    Contadores de banco de dados de uma requisição.
+    """
+
+    __slots__ = ("queries", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+
+# Estatísticas da requisição atual. O objeto é mutável, então as consultas
+# feitas no threadpool ou pelo engine assíncrono somam no mesmo contador.
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("db_query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    """
+    Retorna as estatísticas da requisição atual (None fora de uma requisição).
+    """
+    return _current_stats.get()
+
+
+def _record_pool_wait(elapsed: float) -> None:
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.pool_wait += elapsed
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool que mede o tempo de espera por uma conexão livre.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_pool_wait(time.perf_counter() - start)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Versão de TimedQueuePool para o engine assíncrono.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _record_pool_wait(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Retorna a ocupação atual do pool de conexões de um engine.
+    """
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+
+def instrument_engine(engine: Engine) -> None:
+    """
+    Registra os eventos que contabilizam consultas e tempo de banco.
+
+    Args:
+        engine: Engine síncrono (para o assíncrono, use `async_engine.sync_engine`)
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class EndpointMetrics:
+    """
+    Agregados de uso do banco por endpoint, desde o início do processo.
+    """
+
+    def __init__(self):
+        self._endpoints: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, stats: QueryStats) -> None:
+        with self._lock:
+            item = self._endpoints.setdefault(endpoint, {
+                "requests": 0,
+                "queries": 0,
+                "max_queries": 0,
+                "db_time": 0.0,
+                "pool_wait": 0.0,
+            })
+            item["requests"] += 1
+            item["queries"] += stats.queries
+            item["max_queries"] = max(item["max_queries"], stats.queries)
+            item["db_time"] += stats.db_time
+            item["pool_wait"] += stats.pool_wait
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna médias por requisição de cada endpoint que acessou o banco.
+        """
+        with self._lock:
+            items = list(self._endpoints.items())
+        return {
+            endpoint: {
+                "requests": item["requests"],
+                "queries": item["queries"],
+                "avg_queries": round(item["queries"] / item["requests"], 2),
+                "max_queries": item["max_queries"],
+                "avg_db_time_ms": round(item["db_time"] / item["requests"] * 1000, 2),
+                "avg_pool_wait_ms": round(item["pool_wait"] / item["requests"] * 1000, 2),
+            }
+            for endpoint, item in sorted(items)
+        }
+
+
+# Instância global dos agregados por endpoint
+endpoint_metrics = EndpointMetrics()
+
+
+def _endpoint_name(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or request.url.path
+    return f"{request.method} {path}"
+
+
+async def query_stats_middleware(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    """
+    Middleware HTTP que mede as consultas de cada requisição.
+
+    Os totais são agregados por rota; em modo DEBUG também são devolvidos nos
+    headers X-DB-Queries, X-DB-Time-ms e X-DB-Pool-Wait-ms.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    # Tarefas em segundo plano ainda podem somar consultas depois deste ponto
+    if stats.queries:
+        endpoint_metrics.record(_endpoint_name(request), stats)
+
+    if settings.DEBUG:
+        response.headers["X-DB-Queries"] = str(stats.queries)
+        response.headers["X-DB-Time-ms"] = f"{stats.db_time * 1000:.2f}"
+        response.headers["X-DB-Pool-Wait-ms"] = f"{stats.pool_wait * 1000:.2f}"
+    return response
@@ -1,21 +1,66 @@
 # app/db/session.py
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.db.instrumentation import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
 
 # Use a URL do banco de dados da configuração
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Parâmetros de pool comuns aos dois engines
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+# Engine síncrono: Alembic, scripts e tarefas executadas no threadpool
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=TimedQueuePool, **POOL_OPTIONS)
+instrument_engine(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+
+def get_async_database_url(url: str) -> str:
+    """
+    Converte a URL do banco para o driver assíncrono (asyncpg).
+    """
+    url = make_url(url)
+    if url.drivername in ("postgresql", "postgresql+psycopg2", "postgres"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url.render_as_string(hide_password=False)
+
+
+# Engine assíncrono: endpoints da API, sem bloquear o event loop
+ASYNC_SQLALCHEMY_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool, **POOL_OPTIONS
+)
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,3 +1,6 @@
+from contextlib import asynccontextmanager
+import logging
+
 from fastapi import Depends, FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
@@ -9,13 +12,42 @@ from sqlalchemy.orm import Session
 from app.api.api import api_router
 from app.core.config import settings
 from app.models.product import Product
-from app.db.session import get_db
+from app.db.instrumentation import query_stats_middleware
+from app.db.session import async_engine, get_db
+from app.services.affiliate_link_converter import shutdown_converter_pool
+from app.services.cache import TieredCache, cache
+from app.services.http_pool import http_clients
+from app.services.store_registry import store_registry
+from app.services.sync_scheduler import sync_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if isinstance(cache, TieredCache):
+        # Invalidação do cache local entre workers via pub/sub
+        await cache.start()
+    try:
+        # Carrega as lojas afiliadas e seus clientes uma única vez
+        await store_registry.refresh()
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Error loading affiliate store registry: {e}")
+    if settings.SYNC_SCHEDULER_ENABLED:
+        # Sincronização periódica dos termos configurados em app/core/sync_config.py
+        await sync_scheduler.start()
+    yield
+    await sync_scheduler.stop()
+    shutdown_converter_pool()
+    # Fecha os pools de conexão HTTP compartilhados
+    await http_clients.aclose()
+    await cache.close()
+    await async_engine.dispose()
 
 
 app = FastAPI(
     title="Casa Digital MCP",
     description="Servidor MCP para integração de afiliados e automação de vendas",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 db = Session()
@@ -29,6 +61,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Contagem de consultas e tempo de banco por requisição
+app.middleware("http")(query_stats_middleware)
+
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
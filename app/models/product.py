@@ -1,11 +1,32 @@
 # app/models/product.py
-from sqlalchemy import Column, String, Integer, Numeric, Boolean, DateTime, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, String, Integer, Numeric, Boolean, DateTime, Text, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 from app.db.session import Base
 
+# Documento de busca textual: título pesa mais que marca, que pesa mais que descrição
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('portuguese', coalesce(description, '')), 'C')"
+)
+
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # Necessária para o upsert em lote (INSERT ... ON CONFLICT)
+        UniqueConstraint("platform", "external_id", name="uq_products_platform_external_id"),
+        # Busca textual local (/products/search/local/)
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Listagem paginada dos produtos sem link de afiliado (/affiliate-links/pending/)
+        Index(
+            "ix_products_pending_affiliate", "platform", "id",
+            postgresql_where=text("affiliate_url IS NULL"),
+        ),
+        # Busca aproximada por título: ix_products_title_trgm, índice de expressão
+        # lower(immutable_unaccent(title)) gin_trgm_ops criado na migração e2f8c6a1b3d5
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     external_id = Column(String, index=True)
@@ -20,9 +41,13 @@ class Product(Base):
     category = Column(String, nullable=True)
     brand = Column(String, nullable=True)
     available = Column(Boolean, default=True)
+    # Impressão digital dos campos vindos da plataforma (detecção de mudanças na sincronização)
+    content_hash = Column(String(40), nullable=True)
     # Novo relacionamento com AffiliateStore
     affiliate_store_id = Column(Integer, ForeignKey('affiliate_stores.id'), nullable=True)
     affiliate_store = relationship('AffiliateStore', backref="products")
+    # Coluna gerada pelo banco; não é carregada com o produto, só usada nos filtros
+    search_vector = deferred(Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True)))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -35,4 +35,7 @@ class Product(ProductBase):
     updated_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ProductSearchResult(Product):
+    score: float
@@ -1,7 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, List, Optional, Any
 
+import httpx
+
+from app.core.config import settings
 from app.schemas.product import ProductCreate
+from app.services.single_flight import SingleFlight
 
 class AffiliateClientBase(ABC):
     """
@@ -9,6 +15,45 @@ class AffiliateClientBase(ABC):
     Todas as implementações específicas de plataforma devem herdar desta classe.
     """
     
+    # Agrupamento de requisições idênticas concorrentes, compartilhado pelo processo
+    single_flight = SingleFlight(distributed=settings.SINGLE_FLIGHT_DISTRIBUTED)
+    
+    client: httpx.AsyncClient
+    
+    async def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None) -> Any:
+        """
+        Faz um GET na API da plataforma e retorna o JSON da resposta.
+        
+        Requisições idênticas em andamento ao mesmo tempo compartilham uma
+        única chamada ao servidor (single-flight). O resultado é compartilhado
+        entre os chamadores e não deve ser modificado.
+        
+        Args:
+            url: URL da requisição
+            params: Parâmetros de consulta (opcional)
+            headers: Cabeçalhos HTTP (opcional)
+            
+        Returns:
+            Corpo da resposta decodificado
+            
+        Raises:
+            httpx.HTTPStatusError: Se a resposta tiver status de erro
+        """
+        key = f"{self.platform_name}:GET:{url}"
+        if params:
+            key += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        authorization = (headers or {}).get("Authorization")
+        if authorization:
+            # Respostas podem variar por credencial
+            key += "#" + hashlib.sha1(authorization.encode("utf-8")).hexdigest()[:12]
+        
+        async def fetch() -> Any:
+            response = await self.client.get(url, params=params, headers=headers)
+            response.raise_for_status()
+            return response.json()
+        
+        return await self.single_flight.do(key, fetch)
+    
     @abstractmethod
     async def search_products(self, query: str, category: Optional[str] = None, limit: int = 20) -> List[ProductCreate]:
         """
@@ -24,19 +69,63 @@ class AffiliateClientBase(ABC):
         """
         pass
     
+    async def search_products_paginated(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        max_results: int = 1000,
+        page_size: int = 50,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[ProductCreate]:
+        """
+        Busca produtos percorrendo várias páginas, entregando-os como um gerador assíncrono.
+        
+        A implementação padrão faz uma única chamada a `search_products`;
+        plataformas com paginação devem sobrescrever este método.
+        
+        Args:
+            query: Termo de busca
+            category: Categoria opcional para filtrar
+            max_results: Número máximo de produtos
+            page_size: Produtos por página
+            concurrency: Máximo de páginas buscadas ao mesmo tempo
+            
+        Yields:
+            Produtos encontrados
+        """
+        for product in await self.search_products(query, category=category, limit=max_results):
+            yield product
+    
     @abstractmethod
-    async def get_product_details(self, product_id: str) -> ProductCreate:
+    async def get_product_details(self, product_id: str, include_description: bool = True) -> ProductCreate:
         """
         Obtém detalhes de um produto específico.
         
         Args:
             product_id: ID do produto na plataforma
+            include_description: Se deve buscar a descrição completa (chamada adicional)
             
         Returns:
             Detalhes do produto
         """
         pass
     
+    async def get_products_details_batch(self, product_ids: List[str]) -> List[ProductCreate]:
+        """
+        Obtém detalhes de vários produtos.
+        
+        A implementação padrão busca cada produto em paralelo; plataformas com
+        endpoint de consulta em lote devem sobrescrever este método.
+        
+        Args:
+            product_ids: IDs dos produtos na plataforma
+            
+        Returns:
+            Produtos encontrados, na ordem dos IDs
+        """
+        results = await asyncio.gather(*(self.get_product_details(product_id) for product_id in product_ids))
+        return [product for product in results if product]
+    
     @abstractmethod
     async def get_product_categories(self) -> List[Dict[str, Any]]:
         """
@@ -1,13 +1,16 @@
+import asyncio
 import httpx
-import re
-from typing import Dict, List, Optional, Any
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Any
 import logging
-from urllib.parse import quote, urlparse, parse_qs, urlencode
+from urllib.parse import quote
 
 from app.services.affiliate_clients.base import AffiliateClientBase
 from app.schemas.product import ProductCreate
 from app.core.config import settings
-from app.core.affiliate_config import get_affiliate_config
+from app.services.affiliate_link_converter import convert_to_affiliate_link, extract_product_id
+from app.services.cache_aside import cached
+from app.services.http_pool import http_clients
 
 logger = logging.getLogger(__name__)
 
@@ -18,10 +21,13 @@ class MercadoLivreClient(AffiliateClientBase):
     
     BASE_URL = "https://api.mercadolibre.com"
     SITE_ID = "MLB"  # MLB para Brasil
+    # Campos solicitados no multiget para reduzir o tamanho da resposta
+    MULTIGET_ATTRIBUTES = "id,title,subtitle,price,original_price,thumbnail,permalink,category_id,available_quantity"
     
-    def __init__(self, access_token: Optional[str] = None):
+    def __init__(self, access_token: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         self.access_token = access_token
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Usa o pool compartilhado da plataforma, a menos que um cliente seja injetado
+        self.client = http_client or http_clients.get(self.platform_name)
     
     @property
     def platform_name(self) -> str:
@@ -35,39 +41,9 @@ class MercadoLivreClient(AffiliateClientBase):
             product_url: URL do produto
             
         Returns:
-            Link de afiliado
+            Link de afiliado (ou a URL original, se não for possível converter)
         """
-        try:
-            # Obter configuração de afiliado
-            config = get_affiliate_config("mercadolivre")
-            if not config or not config.get("affiliate_id"):
-                return product_url  # Retorna a URL original se não houver configuração
-            
-            # Extrair o ID do produto da URL
-            product_id = self._extract_product_id(product_url)
-            if not product_id:
-                return product_url  # Retorna a URL original se não conseguir extrair o ID
-            
-            # Construir parâmetros de afiliado
-            params = {
-                "id": product_id,
-                "platform": config.get("platform", "ml"),
-                "referer": config.get("affiliate_id"),
-                "utm_source": config.get("affiliate_id"),
-                "utm_medium": "affiliate",
-            }
-            
-            if config.get("campaign"):
-                params["utm_campaign"] = config.get("campaign")
-            
-            # Construir URL de redirecionamento
-            base_url = "https://www.mercadolivre.com.br/link/redirect"
-            query_string = urlencode(params)
-            
-            return f"{base_url}?{query_string}"
-        except Exception as e:
-            logger.error(f"Error converting to affiliate link: {e}")
-            return product_url  # Retorna a URL original em caso de erro
+        return convert_to_affiliate_link(product_url, self.platform_name)
     
     def _extract_product_id(self, url: str) -> Optional[str]:
         """
@@ -79,31 +55,9 @@ class MercadoLivreClient(AffiliateClientBase):
         Returns:
             ID do produto ou None se não encontrado
         """
-        try:
-            # Padrão 1: URLs de produto padrão (MLB12345678)
-            pattern1 = r"MLB-?(\d+)"
-            match1 = re.search(pattern1, url)
-            if match1:
-                return f"MLB{match1.group(1)}"
-            
-            # Padrão 2: URLs com ID no parâmetro de consulta
-            parsed_url = urlparse(url)
-            query_params = parse_qs(parsed_url.query)
-            
-            if "id" in query_params:
-                return query_params["id"][0]
-            
-            # Padrão 3: URLs de produto no formato /p/MLB12345678
-            pattern3 = r"/p/(MLB\d+)"
-            match3 = re.search(pattern3, url)
-            if match3:
-                return match3.group(1)
-            
-            return None
-        except Exception as e:
-            logger.error(f"Error extracting product ID: {e}")
-            return None
+        return extract_product_id(url)
     
+    @cached("ml:search", ttl=settings.ML_CACHE_SEARCH_TTL, stale_ttl=settings.CACHE_STALE_TTL, model=ProductCreate)
     async def search_products(self, query: str, category: Optional[str] = None, limit: int = 20) -> List[ProductCreate]:
         """
         Busca produtos no Mercado Livre.
@@ -128,38 +82,9 @@ class MercadoLivreClient(AffiliateClientBase):
             if self.access_token:
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
-            # Fazer requisição
-            response = await self.client.get(search_url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            products = []
-            
-            for item in data.get("results", []):
-                try:
-                    # Converter URL genérica para link de afiliado
-                    product_url = item["permalink"]
-                    affiliate_url = self.convert_to_affiliate_link(product_url)
-                    
-                    # Converter para o formato do nosso modelo
-                    product = ProductCreate(
-                        external_id=item["id"],
-                        platform=self.platform_name,
-                        title=item["title"],
-                        description=item.get("description", ""),  # Descrição completa requer outra chamada
-                        price=float(item["price"]),
-                        sale_price=float(item.get("original_price", 0)) if item.get("original_price") else None,
-                        image_url=item["thumbnail"],
-                        product_url=affiliate_url,  # Use o link de afiliado
-                        category=item.get("category_id", ""),
-                        brand=None,  # Requer outra chamada para obter
-                        available=item.get("available_quantity", 0) > 0
-                    )
-                    products.append(product)
-                except Exception as e:
-                    logger.error(f"Error processing product {item.get('id')}: {e}")
-            
-            return products
+            # Fazer requisição (requisições idênticas concorrentes são agrupadas)
+            data = await self._get_json(search_url, headers=headers)
+            return self._parse_search_results(data)
             
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error during search: {e}")
@@ -168,12 +93,127 @@ class MercadoLivreClient(AffiliateClientBase):
             logger.error(f"Error during search: {e}")
             return []
     
-    async def get_product_details(self, product_id: str) -> Optional[ProductCreate]:
+    def _parse_search_results(self, data: Dict[str, Any]) -> List[ProductCreate]:
+        """
+        Converte os resultados de uma página de busca para o formato do nosso modelo.
+        
+        Args:
+            data: Resposta do endpoint de busca
+            
+        Returns:
+            Lista de produtos
+        """
+        products = []
+        
+        for item in data.get("results", []):
+            try:
+                # Converter URL genérica para link de afiliado
+                product_url = item["permalink"]
+                affiliate_url = self.convert_to_affiliate_link(product_url)
+                
+                # Converter para o formato do nosso modelo
+                product = ProductCreate(
+                    external_id=item["id"],
+                    platform=self.platform_name,
+                    title=item["title"],
+                    description=item.get("description", ""),  # Descrição completa requer outra chamada
+                    price=float(item["price"]),
+                    sale_price=float(item.get("original_price", 0)) if item.get("original_price") else None,
+                    image_url=item["thumbnail"],
+                    product_url=affiliate_url,  # Use o link de afiliado
+                    category=item.get("category_id", ""),
+                    brand=None,  # Requer outra chamada para obter
+                    available=item.get("available_quantity", 0) > 0
+                )
+                products.append(product)
+            except Exception as e:
+                logger.error(f"Error processing product {item.get('id')}: {e}")
+        
+        return products
+    
+    async def search_products_paginated(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        max_results: int = 1000,
+        page_size: int = 50,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[ProductCreate]:
+        """
+        Busca produtos no Mercado Livre percorrendo várias páginas de resultados.
+        
+        A primeira página informa o total; as demais são buscadas em paralelo
+        (no máximo `concurrency` páginas em andamento) e os produtos são
+        entregues na ordem da busca, sem manter o resultado inteiro em memória.
+        
+        Args:
+            query: Termo de busca
+            category: ID da categoria (opcional)
+            max_results: Número máximo de produtos (limitado pelo offset máximo da API)
+            page_size: Produtos por página (máximo 50)
+            concurrency: Máximo de páginas buscadas ao mesmo tempo (padrão em settings)
+            
+        Yields:
+            Produtos encontrados
+        """
+        page_size = max(1, min(page_size, 50))
+        max_results = min(max_results, settings.ML_SEARCH_MAX_RESULTS)
+        concurrency = concurrency or settings.ML_SEARCH_PAGE_CONCURRENCY
+        
+        search_url = f"{self.BASE_URL}/sites/{self.SITE_ID}/search"
+        headers = {}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        
+        async def fetch_page(offset: int) -> Dict[str, Any]:
+            params = {"q": query, "limit": min(page_size, max_results - offset), "offset": offset}
+            if category:
+                params["category"] = category
+            try:
+                return await self._get_json(search_url, params=params, headers=headers)
+            except Exception as e:
+                logger.error(f"Error during search (offset {offset}): {e}")
+                return {}
+        
+        if max_results <= 0:
+            return
+        
+        first_page = await fetch_page(0)
+        for product in self._parse_search_results(first_page):
+            yield product
+        
+        total = first_page.get("paging", {}).get("total", 0)
+        offsets = iter(range(page_size, min(total, max_results), page_size))
+        pending: Deque[asyncio.Task] = deque()
+        
+        def schedule() -> None:
+            # Janela deslizante: mantém no máximo `concurrency` páginas em andamento
+            while len(pending) < concurrency:
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                pending.append(asyncio.create_task(fetch_page(offset)))
+        
+        try:
+            schedule()
+            while pending:
+                data = await pending.popleft()
+                schedule()
+                for product in self._parse_search_results(data):
+                    yield product
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    @cached("ml:details", ttl=settings.ML_CACHE_DETAILS_TTL, stale_ttl=settings.CACHE_STALE_TTL, model=ProductCreate)
+    async def get_product_details(self, product_id: str, include_description: bool = True) -> Optional[ProductCreate]:
         """
         Obtém detalhes de um produto específico.
         
         Args:
             product_id: ID do produto no Mercado Livre
+            include_description: Se deve buscar a descrição completa. Use False em
+                listagens para evitar a chamada adicional a /description
             
         Returns:
             Detalhes do produto ou None se não encontrado
@@ -187,35 +227,17 @@ class MercadoLivreClient(AffiliateClientBase):
             if self.access_token:
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
-            # Fazer requisição
-            response = await self.client.get(product_url, headers=headers)
-            response.raise_for_status()
-            
-            item = response.json()
-            
-            # Obter descrição completa
-            description = await self._get_product_description(product_id)
-            
-            # Converter URL genérica para link de afiliado
-            original_url = item["permalink"]
-            affiliate_url = self.convert_to_affiliate_link(original_url)
-            
-            # Converter para o formato do nosso modelo
-            product = ProductCreate(
-                external_id=item["id"],
-                platform=self.platform_name,
-                title=item["title"],
-                description=description or item.get("subtitle", ""),
-                price=float(item["price"]),
-                sale_price=float(item.get("original_price", 0)) if item.get("original_price") else None,
-                image_url=item["thumbnail"],
-                product_url=affiliate_url,  # Use o link de afiliado
-                category=item.get("category_id", ""),
-                brand=None,  # Tentar extrair da descrição ou atributos
-                available=item.get("available_quantity", 0) > 0
-            )
+            description = None
+            if include_description:
+                # Item e descrição são independentes: buscar em paralelo
+                item, description = await asyncio.gather(
+                    self._get_json(product_url, headers=headers),
+                    self._get_product_description(product_id),
+                )
+            else:
+                item = await self._get_json(product_url, headers=headers)
             
-            return product
+            return self._item_to_product(item, description)
             
         except httpx.HTTPStatusError as e:
             logger.error(f"HTTP error getting product details: {e}")
@@ -224,6 +246,85 @@ class MercadoLivreClient(AffiliateClientBase):
             logger.error(f"Error getting product details: {e}")
             return None
     
+    def _item_to_product(self, item: Dict[str, Any], description: Optional[str] = None) -> ProductCreate:
+        """
+        Converte um item da API (/items) para o formato do nosso modelo.
+        
+        Args:
+            item: Item retornado pela API
+            description: Descrição completa do produto (opcional)
+            
+        Returns:
+            Produto convertido
+        """
+        # Converter URL genérica para link de afiliado
+        original_url = item["permalink"]
+        affiliate_url = self.convert_to_affiliate_link(original_url)
+        
+        return ProductCreate(
+            external_id=item["id"],
+            platform=self.platform_name,
+            title=item["title"],
+            description=description or item.get("subtitle") or "",
+            price=float(item["price"]),
+            sale_price=float(item.get("original_price", 0)) if item.get("original_price") else None,
+            image_url=item["thumbnail"],
+            product_url=affiliate_url,  # Use o link de afiliado
+            category=item.get("category_id", ""),
+            brand=None,  # Tentar extrair da descrição ou atributos
+            available=item.get("available_quantity", 0) > 0
+        )
+    
+    async def get_products_details_batch(self, product_ids: List[str]) -> List[ProductCreate]:
+        """
+        Obtém detalhes de vários produtos usando o endpoint multiget (/items?ids=...).
+        
+        Os IDs são divididos em lotes do tamanho aceito pela API e os lotes são
+        buscados em paralelo. A descrição completa não é incluída (requer uma
+        chamada por item); é usado o subtítulo quando disponível.
+        
+        Args:
+            product_ids: IDs dos produtos no Mercado Livre
+            
+        Returns:
+            Produtos encontrados, na ordem dos IDs
+        """
+        # Remover duplicados preservando a ordem
+        product_ids = list(dict.fromkeys(product_ids))
+        batch_size = settings.ML_MULTIGET_BATCH_SIZE
+        chunks = [product_ids[i:i + batch_size] for i in range(0, len(product_ids), batch_size)]
+        
+        headers = {}
+        if self.access_token:
+            headers["Authorization"] = f"Bearer {self.access_token}"
+        
+        semaphore = asyncio.Semaphore(settings.ML_MULTIGET_CONCURRENCY)
+        
+        async def fetch_chunk(chunk: List[str]) -> List[Dict[str, Any]]:
+            params = {"ids": ",".join(chunk), "attributes": self.MULTIGET_ATTRIBUTES}
+            try:
+                async with semaphore:
+                    return await self._get_json(f"{self.BASE_URL}/items", params=params, headers=headers)
+            except Exception as e:
+                logger.error(f"Error getting products batch: {e}")
+                return []
+        
+        responses = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+        
+        items = {}
+        for response in responses:
+            for entry in response:
+                if entry.get("code") != 200 or not entry.get("body"):
+                    continue
+                item = entry["body"]
+                try:
+                    items[item["id"]] = self._item_to_product(item)
+                except Exception as e:
+                    logger.error(f"Error processing product {item.get('id')}: {e}")
+        
+        return [items[product_id] for product_id in product_ids if product_id in items]
+    
+    @cached("ml:description", ttl=settings.ML_CACHE_DESCRIPTION_TTL, stale_ttl=settings.CACHE_STALE_TTL)
     async def _get_product_description(self, product_id: str) -> Optional[str]:
         """
         Obtém a descrição completa de um produto.
@@ -244,16 +345,14 @@ class MercadoLivreClient(AffiliateClientBase):
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
             # Fazer requisição
-            response = await self.client.get(description_url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
+            data = await self._get_json(description_url, headers=headers)
             return data.get("plain_text", "")
             
         except Exception as e:
             logger.error(f"Error getting product description: {e}")
             return None
     
+    @cached("ml:categories", ttl=settings.ML_CACHE_CATEGORIES_TTL, stale_ttl=settings.CACHE_STALE_TTL)
     async def get_product_categories(self) -> List[Dict[str, Any]]:
         """
         Obtém as categorias de produtos disponíveis no Mercado Livre.
@@ -271,10 +370,7 @@ class MercadoLivreClient(AffiliateClientBase):
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
             # Fazer requisição
-            response = await self.client.get(categories_url, headers=headers)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self._get_json(categories_url, headers=headers)
             
         except Exception as e:
             logger.error(f"Error getting categories: {e}")
@@ -300,25 +396,35 @@ class MercadoLivreClient(AffiliateClientBase):
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
             # Fazer requisição
-            response = await self.client.get(category_url, headers=headers)
-            response.raise_for_status()
-            
-            return response.json()
+            return await self._get_json(category_url, headers=headers)
             
         except Exception as e:
             logger.error(f"Error getting category details: {e}")
             return None
     
-    async def get_trending_products(self, category: Optional[str] = None, limit: int = 20) -> List[ProductCreate]:
+    async def get_trending_products(
+        self,
+        category: Optional[str] = None,
+        limit: int = 20,
+        concurrency: Optional[int] = None,
+        item_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> List[ProductCreate]:
         """
         Obtém produtos em tendência no Mercado Livre.
         
+        Os detalhes dos produtos são buscados em paralelo, limitados por um
+        semáforo. Se o prazo total expirar, retorna os produtos já obtidos.
+        
         Args:
             category: ID da categoria (opcional)
             limit: Número máximo de resultados
+            concurrency: Máximo de produtos buscados ao mesmo tempo (padrão em settings)
+            item_timeout: Tempo máximo (segundos) por produto (padrão em settings)
+            deadline: Tempo máximo (segundos) para toda a operação (padrão em settings)
             
         Returns:
-            Lista de produtos em tendência
+            Lista de produtos em tendência, na ordem das tendências
         """
         try:
             # Construir URL de tendências
@@ -335,31 +441,77 @@ class MercadoLivreClient(AffiliateClientBase):
                 headers["Authorization"] = f"Bearer {self.access_token}"
             
             # Fazer requisição
-            response = await self.client.get(trending_url, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            products = []
+            data = await self._get_json(trending_url, headers=headers)
             
+            product_ids = []
             for trend in data:
-                try:
-                    # Obter detalhes do produto
-                    product_id = trend.get("id") or trend.get("product_id")
-                    if product_id:
-                        product_details = await self.get_product_details(product_id)
-                        if product_details:
-                            products.append(product_details)
-                except Exception as e:
-                    logger.error(f"Error processing trending product: {e}")
-            
-            return products
+                product_id = trend.get("id") or trend.get("product_id")
+                if product_id:
+                    product_ids.append(product_id)
+            
+            return await self._get_products_details_ordered(
+                product_ids,
+                concurrency=concurrency or settings.ML_TRENDING_CONCURRENCY,
+                item_timeout=item_timeout or settings.ML_TRENDING_ITEM_TIMEOUT,
+                deadline=deadline or settings.ML_TRENDING_DEADLINE,
+            )
             
         except Exception as e:
             logger.error(f"Error getting trending products: {e}")
             return []
     
+    async def _get_products_details_ordered(
+        self,
+        product_ids: List[str],
+        concurrency: int,
+        item_timeout: float,
+        deadline: float,
+    ) -> List[ProductCreate]:
+        """
+        Busca detalhes de vários produtos com concorrência limitada, preservando a ordem.
+        
+        Args:
+            product_ids: IDs dos produtos
+            concurrency: Máximo de buscas simultâneas
+            item_timeout: Tempo máximo (segundos) por produto
+            deadline: Tempo máximo (segundos) para todas as buscas
+            
+        Returns:
+            Produtos obtidos dentro do prazo, na ordem dos IDs
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch(product_id: str) -> Optional[ProductCreate]:
+            async with semaphore:
+                return await asyncio.wait_for(self.get_product_details(product_id), timeout=item_timeout)
+        
+        tasks = [asyncio.create_task(fetch(product_id)) for product_id in product_ids]
+        if not tasks:
+            return []
+        
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Deadline exceeded fetching products: returning {len(done)} of {len(tasks)}")
+        
+        products = []
+        for product_id, task in zip(product_ids, tasks):
+            if task not in done:
+                continue
+            if task.exception() is not None:
+                logger.error(f"Error processing product {product_id}: {task.exception()!r}")
+                continue
+            if task.result():
+                products.append(task.result())
+        
+        return products
+    
     async def close(self):
         """
-        Fecha o cliente HTTP.
+        Libera o cliente HTTP.
+        
+        O pool de conexões é compartilhado e fechado no shutdown da aplicação
+        (ver `http_clients.aclose`), portanto não é encerrado aqui.
         """
-        await self.client.aclose()
\ No newline at end of file
+        pass
\ No newline at end of file
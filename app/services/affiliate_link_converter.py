@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+from urllib.parse import quote_plus, unquote_plus, urlencode
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.affiliate_config import get_affiliate_config, is_affiliate_id_configured
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Plataformas com conversão local de links (sem chamada à API)
+SUPPORTED_PLATFORMS = ("mercadolivre",)
+
+MERCADOLIVRE_REDIRECT_URL = "https://www.mercadolivre.com.br/link/redirect"
+
+# Compilados uma única vez; "MLB-?(\d+)" também cobre URLs no formato /p/MLB12345678
+_MLB_ID_RE = re.compile(r"MLB-?(\d+)")
+_QUERY_ID_RE = re.compile(r"(?:^|&)id=([^&]+)")
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def extract_product_id(url: str) -> Optional[str]:
+    """
+    Extrai o ID do produto de uma URL do Mercado Livre.
+
+    Args:
+        url: URL do produto
+
+    Returns:
+        ID do produto ou None se não encontrado
+    """
+    match = _MLB_ID_RE.search(url)
+    if match:
+        return f"MLB{match.group(1)}"
+
+    # ID no parâmetro de consulta, sem urlparse/parse_qs da URL inteira
+    query = url.partition("#")[0].partition("?")[2]
+    if query:
+        match = _QUERY_ID_RE.search(query)
+        if match:
+            return unquote_plus(match.group(1))
+    return None
+
+
+@lru_cache(maxsize=None)
+def _link_template(platform: str) -> Optional[Tuple[str, str]]:
+    # Prefixo e sufixo do link de afiliado, montados uma vez por plataforma
+    config = get_affiliate_config(platform)
+    if platform != "mercadolivre" or not is_affiliate_id_configured(config):
+        return None
+
+    params = {
+        "platform": config.get("platform", "ml"),
+        "referer": config.get("affiliate_id"),
+        "utm_source": config.get("affiliate_id"),
+        "utm_medium": "affiliate",
+    }
+    if config.get("campaign"):
+        params["utm_campaign"] = config.get("campaign")
+
+    return f"{MERCADOLIVRE_REDIRECT_URL}?id=", "&" + urlencode(params)
+
+
+def is_conversion_configured(platform: str) -> bool:
+    """
+    Verifica se há um ID de afiliado real para converter links da plataforma.
+    """
+    return _link_template(platform) is not None
+
+
+def clear_config_cache() -> None:
+    """
+    Descarta os modelos de link em cache (após alterar AFFILIATE_CONFIG).
+    """
+    _link_template.cache_clear()
+
+
+def build_affiliate_link(url: str, platform: str = "mercadolivre") -> Optional[str]:
+    """
+    Gera o link de afiliado de uma URL de produto.
+
+    Args:
+        url: URL do produto
+        platform: Plataforma de afiliados
+
+    Returns:
+        Link de afiliado, ou None se não houver configuração ou ID reconhecível
+    """
+    template = _link_template(platform)
+    if template is None or not url:
+        return None
+    product_id = extract_product_id(url)
+    if not product_id:
+        return None
+    return template[0] + quote_plus(product_id) + template[1]
+
+
+def convert_to_affiliate_link(url: str, platform: str = "mercadolivre") -> str:
+    """
+    Converte uma URL em link de afiliado, ou a devolve inalterada se não for possível.
+    """
+    try:
+        return build_affiliate_link(url, platform) or url
+    except Exception as e:
+        logger.error(f"Error converting to affiliate link: {e}")
+        return url
+
+
+def convert_urls(urls: Sequence[str], platform: str = "mercadolivre") -> List[Optional[str]]:
+    """
+    Converte um lote de URLs em links de afiliado.
+
+    Args:
+        urls: URLs dos produtos
+        platform: Plataforma de afiliados
+
+    Returns:
+        Links de afiliado na mesma ordem (None para as URLs não convertidas)
+    """
+    template = _link_template(platform)
+    if template is None:
+        return [None] * len(urls)
+
+    prefix, suffix = template
+    results: List[Optional[str]] = []
+    append = results.append
+    for url in urls:
+        product_id = extract_product_id(url) if isinstance(url, str) and url else None
+        append(prefix + quote_plus(product_id) + suffix if product_id else None)
+    return results
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: não herda o event loop, threads e conexões do processo da API
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.AFFILIATE_CONVERT_WORKERS or os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def convert_urls_async(urls: Sequence[str], platform: str = "mercadolivre") -> List[Optional[str]]:
+    """
+    Converte um lote de URLs sem bloquear o event loop.
+
+    Lotes pequenos rodam no threadpool; a partir de
+    AFFILIATE_CONVERT_POOL_THRESHOLD, são divididos em blocos processados em
+    paralelo no pool de processos.
+
+    Args:
+        urls: URLs dos produtos
+        platform: Plataforma de afiliados
+
+    Returns:
+        Links de afiliado na mesma ordem (None para as URLs não convertidas)
+    """
+    if len(urls) < settings.AFFILIATE_CONVERT_POOL_THRESHOLD:
+        return await run_in_threadpool(convert_urls, urls, platform)
+
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    size = settings.AFFILIATE_CONVERT_CHUNK_SIZE
+    try:
+        chunks = await asyncio.gather(*(
+            loop.run_in_executor(pool, convert_urls, list(urls[start:start + size]), platform)
+            for start in range(0, len(urls), size)
+        ))
+    except BrokenProcessPool as e:
+        # Um processo morreu: recria o pool na próxima chamada e converte no threadpool
+        logger.error(f"Affiliate link converter pool is broken: {e}")
+        shutdown_converter_pool()
+        return await run_in_threadpool(convert_urls, urls, platform)
+
+    results: List[Optional[str]] = []
+    for chunk in chunks:
+        results.extend(chunk)
+    return results
+
+
+def shutdown_converter_pool() -> None:
+    """
+    Encerra o pool de processos de conversão (no desligamento da aplicação).
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
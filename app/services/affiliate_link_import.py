@@ -0,0 +1,345 @@
+import codecs
+import csv
+import gzip
+import logging
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Integer, String, column, select, update, values
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.services.affiliate_link_converter import convert_urls, is_conversion_configured
+from app.services.context_service import invalidate_context_documents
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_HEADERS = ["product_id", "affiliate_url"]
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def is_valid_affiliate_url(url: str) -> bool:
+    """
+    Valida se a URL parece ser um link de afiliado válido do Mercado Livre.
+    """
+    # Verificação básica para links de afiliado do Mercado Livre
+    # Ajuste conforme necessário com base nos padrões reais
+    valid_patterns = [
+        "mercadolivre.com.br/social/",
+        "mercadolivre.com.br/link/redirect",
+        "mercadolibre.com/social/",
+        "mercadolibre.com/link/redirect"
+    ]
+
+    return any(pattern in url for pattern in valid_patterns)
+
+
+def _open_text(fileobj: IO[bytes]) -> IO[str]:
+    is_gzip = fileobj.read(2) == GZIP_MAGIC
+    fileobj.seek(0)
+    if is_gzip:
+        fileobj = gzip.GzipFile(fileobj=fileobj, mode="rb")
+    # StreamReader decodifica incrementalmente qualquer objeto com read(),
+    # inclusive SpooledTemporaryFile (que não implementa a interface io completa)
+    return codecs.getreader("utf-8-sig")(fileobj)
+
+
+def open_csv_stream(fileobj: IO[bytes]) -> csv.DictReader:
+    """
+    Abre um arquivo CSV (opcionalmente compactado com gzip) para leitura incremental.
+
+    Args:
+        fileobj: Arquivo binário posicionado no início
+
+    Returns:
+        Leitor de linhas do CSV
+    """
+    return csv.DictReader(_open_text(fileobj))
+
+
+def validate_headers(fileobj: IO[bytes]) -> Optional[List[str]]:
+    """
+    Verifica se o CSV contém os cabeçalhos obrigatórios.
+
+    Args:
+        fileobj: Arquivo binário posicionado no início (volta ao início ao final)
+
+    Returns:
+        Cabeçalhos encontrados, ou None se algum obrigatório estiver ausente
+    """
+    headers = next(csv.reader(_open_text(fileobj)), [])
+    fileobj.seek(0)
+    if not all(header in headers for header in REQUIRED_HEADERS):
+        return None
+    return list(headers)
+
+
+def _read_chunks(reader: csv.DictReader, size: int) -> Iterator[List[Tuple[int, Dict[str, str]]]]:
+    chunk = []
+    for row in reader:
+        chunk.append((reader.line_num, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def update_affiliate_urls(db: Session, updates: Dict[int, str]) -> List[int]:
+    """
+    Grava os links de afiliado com um único UPDATE ... FROM (VALUES ...) e confirma a transação.
+
+    Args:
+        db: Sessão do banco de dados
+        updates: Link de afiliado por ID do produto
+
+    Returns:
+        IDs dos produtos atualizados
+    """
+    data = values(
+        column("id", Integer),
+        column("affiliate_url", String),
+        name="data",
+    ).data(list(updates.items()))
+    stmt = (
+        update(Product)
+        .where(Product.id == data.c.id)
+        .values(affiliate_url=data.c.affiliate_url)
+        .returning(Product.id)
+    )
+    updated_ids = db.execute(stmt).scalars().all()
+    db.commit()
+    invalidate_context_documents(updated_ids)
+    return updated_ids
+
+
+def apply_affiliate_links_chunk(db: Session, rows: List[Tuple[int, Dict[str, str]]]) -> Dict[str, Any]:
+    """
+    Valida um lote de linhas e atualiza os produtos com um único UPDATE ... FROM (VALUES ...).
+
+    Args:
+        db: Sessão do banco de dados
+        rows: Linhas do CSV com o número da linha
+
+    Returns:
+        Contagens do lote e amostras de erros
+    """
+    updates: Dict[int, str] = {}
+    errors: List[str] = []
+
+    for line_num, row in rows:
+        try:
+            product_id = int(row["product_id"])
+            affiliate_url = (row["affiliate_url"] or "").strip()
+        except Exception as e:
+            errors.append(f"Linha {line_num}: erro ao processar linha - {e}")
+            continue
+
+        if not is_valid_affiliate_url(affiliate_url):
+            errors.append(f"Linha {line_num}: URL de afiliado inválida para o produto {product_id}: {affiliate_url}")
+            continue
+
+        updates[product_id] = affiliate_url
+
+    updated = len(update_affiliate_urls(db, updates)) if updates else 0
+
+    return {
+        "rows": len(rows),
+        "updated": updated,
+        "not_found": len(updates) - updated,
+        "invalid": len(errors),
+        "errors": errors,
+    }
+
+
+def import_affiliate_links(
+    fileobj: IO[bytes],
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Importa links de afiliado de um CSV em lotes, com memória constante.
+
+    Args:
+        fileobj: Arquivo CSV binário (opcionalmente gzip), posicionado no início
+        on_progress: Função chamada após cada lote com o progresso acumulado
+        chunk_size: Linhas por lote (padrão em settings)
+
+    Returns:
+        Progresso final da importação
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    progress: Dict[str, Any] = {
+        "status": "processing",
+        "chunks": 0,
+        "rows": 0,
+        "updated": 0,
+        "not_found": 0,
+        "invalid": 0,
+        "errors": [],
+    }
+
+    db = SessionLocal()
+    try:
+        reader = open_csv_stream(fileobj)
+        for chunk in _read_chunks(reader, chunk_size):
+            try:
+                result = apply_affiliate_links_chunk(db, chunk)
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Erro ao processar lote {progress['chunks'] + 1}: {e}")
+                result = {
+                    "rows": len(chunk),
+                    "updated": 0,
+                    "not_found": 0,
+                    "invalid": len(chunk),
+                    "errors": [f"Lote {progress['chunks'] + 1}: {e}"],
+                }
+
+            progress["chunks"] += 1
+            for key in ("rows", "updated", "not_found", "invalid"):
+                progress[key] += result[key]
+            # Mantém apenas uma amostra dos erros para não crescer com o arquivo
+            room = settings.IMPORT_MAX_ERROR_SAMPLES - len(progress["errors"])
+            if room > 0:
+                progress["errors"].extend(result["errors"][:room])
+
+            if on_progress:
+                on_progress(dict(progress))
+
+        progress["status"] = "completed"
+    except Exception as e:
+        logger.error(f"Erro durante o processamento em lote: {e}")
+        progress["status"] = "failed"
+        progress["error"] = str(e)
+    finally:
+        db.close()
+        fileobj.close()
+
+    logger.info(
+        f"Processamento concluído: {progress['updated']} produtos atualizados, "
+        f"{progress['invalid'] + progress['not_found']} erros"
+    )
+    if on_progress:
+        on_progress(dict(progress))
+    return progress
+
+
+def revalidate_affiliate_links(
+    platform: str,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Revalida os links de afiliado existentes e remove os inválidos, para que
+    os produtos voltem à lista de pendentes.
+
+    Args:
+        platform: Plataforma de afiliados
+        on_progress: Função chamada após cada lote com o progresso acumulado
+        batch_size: Linhas lidas por lote (padrão em settings)
+
+    Returns:
+        Quantidade de links verificados e de links inválidos removidos
+    """
+    batch_size = batch_size or settings.IMPORT_CHUNK_SIZE
+    progress = {"checked": 0, "invalid": 0}
+
+    stmt = (
+        select(Product.id, Product.affiliate_url)
+        .where(Product.platform == platform, Product.affiliate_url != None)
+        .execution_options(yield_per=batch_size)
+    )
+
+    db = SessionLocal()
+    try:
+        invalid_ids: List[int] = []
+        for partition in db.execute(stmt).partitions():
+            progress["checked"] += len(partition)
+            invalid_ids.extend(row.id for row in partition if not is_valid_affiliate_url(row.affiliate_url))
+            if on_progress:
+                on_progress(dict(progress))
+
+        # Atualiza depois da leitura, sem disputar o cursor aberto
+        for start in range(0, len(invalid_ids), batch_size):
+            ids = invalid_ids[start:start + batch_size]
+            db.execute(update(Product).where(Product.id.in_(ids)).values(affiliate_url=None))
+            db.commit()
+            invalidate_context_documents(ids)
+            progress["invalid"] += len(ids)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Validação concluída: {progress['invalid']} links inválidos encontrados e marcados para atualização")
+    return progress
+
+
+def backfill_affiliate_links(
+    platform: str,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Gera localmente os links de afiliado dos produtos pendentes, em uma única passada.
+
+    Percorre os produtos sem link por chave (id), usando o índice parcial
+    ix_products_pending_affiliate, converte as URLs em lote e grava cada lote
+    com um único UPDATE.
+
+    Args:
+        platform: Plataforma de afiliados
+        on_progress: Função chamada após cada lote com o progresso acumulado
+        batch_size: Produtos por lote (padrão em settings)
+
+    Returns:
+        Quantidade de produtos verificados, atualizados e não convertidos
+
+    Raises:
+        ValueError: Se a plataforma não tiver um ID de afiliado real configurado
+    """
+    # Links com o ID de exemplo passariam na validação e esvaziariam a lista de pendentes
+    if not is_conversion_configured(platform):
+        raise ValueError(f"ID de afiliado não configurado para a plataforma: {platform}")
+
+    batch_size = batch_size or settings.IMPORT_CHUNK_SIZE
+    progress = {"checked": 0, "updated": 0, "skipped": 0}
+
+    base = (
+        select(Product.id, Product.product_url)
+        .where(Product.platform == platform, Product.affiliate_url == None)
+        .order_by(Product.id)
+        .limit(batch_size)
+    )
+
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            # Sem cursor aberto: cada lote é uma nova consulta a partir do último id
+            rows = db.execute(base.where(Product.id > last_id)).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            links = convert_urls([row.product_url for row in rows], platform)
+            updates = {row.id: link for row, link in zip(rows, links) if link}
+            updated = len(update_affiliate_urls(db, updates)) if updates else 0
+
+            progress["checked"] += len(rows)
+            progress["updated"] += updated
+            progress["skipped"] += len(rows) - len(updates)
+            if on_progress:
+                on_progress(dict(progress))
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    logger.info(f"Backfill concluído: {progress['updated']} links de afiliado gerados, {progress['skipped']} produtos sem conversão")
+    return progress
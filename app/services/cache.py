@@ -1,6 +1,10 @@
+import asyncio
 import json
-from typing import Any, Optional
-import redis
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+import redis.asyncio as redis
 import logging
 from datetime import timedelta
 
@@ -10,17 +14,21 @@ logger = logging.getLogger(__name__)
 
 class RedisCache:
     """
-    Serviço de cache usando Redis.
+    Serviço de cache usando Redis (cliente assíncrono com pool de conexões compartilhado).
     """
     
     def __init__(self):
-        self.redis = redis.Redis(
+        self.pool = redis.ConnectionPool(
             host=settings.REDIS_HOST,
             port=settings.REDIS_PORT,
             db=settings.REDIS_DB,
             password=settings.REDIS_PASSWORD,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
             decode_responses=True
         )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        self.hits = 0
+        self.misses = 0
     
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -28,19 +36,49 @@ class RedisCache:
         
         Args:
             key: Chave do cache
-            
+        
         Returns:
             Valor armazenado ou None se não encontrado
         """
         try:
-            value = self.redis.get(key)
+            value = await self.redis.get(key)
             if value:
+                self.hits += 1
                 return json.loads(value)
+            self.misses += 1
             return None
         except Exception as e:
             logger.error(f"Error getting value from cache: {e}")
             return None
     
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """
+        Obtém vários valores do cache em uma única ida ao Redis (MGET).
+        
+        Args:
+            keys: Chaves do cache
+        
+        Returns:
+            Dicionário apenas com as chaves encontradas
+        """
+        keys = list(keys)
+        if not keys:
+            return {}
+        
+        try:
+            values = await self.redis.mget(keys)
+            found = {
+                key: json.loads(value)
+                for key, value in zip(keys, values)
+                if value
+            }
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+            return found
+        except Exception as e:
+            logger.error(f"Error getting values from cache: {e}")
+            return {}
+    
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """
         Armazena um valor no cache.
@@ -49,32 +87,60 @@ class RedisCache:
             key: Chave do cache
             value: Valor a ser armazenado
             expire: Tempo de expiração em segundos (opcional)
-            
+        
         Returns:
             True se o valor foi armazenado com sucesso, False caso contrário
         """
         try:
             serialized = json.dumps(value)
             if expire:
-                return self.redis.setex(key, expire, serialized)
+                return await self.redis.setex(key, expire, serialized)
             else:
-                return self.redis.set(key, serialized)
+                return await self.redis.set(key, serialized)
         except Exception as e:
             logger.error(f"Error setting value in cache: {e}")
             return False
     
+    async def set_many(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        """
+        Armazena vários valores no cache em uma única ida ao Redis (pipeline).
+        
+        Args:
+            mapping: Dicionário chave -> valor
+            expire: Tempo de expiração em segundos (opcional)
+        
+        Returns:
+            True se os valores foram armazenados com sucesso, False caso contrário
+        """
+        if not mapping:
+            return True
+        
+        try:
+            serialized = {key: json.dumps(value) for key, value in mapping.items()}
+            if not expire:
+                return await self.redis.mset(serialized)
+            
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in serialized.items():
+                    pipe.setex(key, expire, value)
+                results = await pipe.execute()
+            return all(results)
+        except Exception as e:
+            logger.error(f"Error setting values in cache: {e}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """
         Remove um valor do cache.
         
         Args:
             key: Chave do cache
-            
+        
         Returns:
             True se o valor foi removido com sucesso, False caso contrário
         """
         try:
-            return bool(self.redis.delete(key))
+            return bool(await self.redis.delete(key))
         except Exception as e:
             logger.error(f"Error deleting value from cache: {e}")
             return False
@@ -87,10 +153,233 @@ class RedisCache:
             True se o cache foi limpo com sucesso, False caso contrário
         """
         try:
-            return self.redis.flushdb()
+            return await self.redis.flushdb()
         except Exception as e:
             logger.error(f"Error clearing cache: {e}")
             return False
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna os contadores de acerto/falha do cache.
+        
+        Returns:
+            Dicionário com as estatísticas do Redis (L2)
+        """
+        return {"l2": {"hits": self.hits, "misses": self.misses}}
+    
+    async def close(self) -> None:
+        """
+        Fecha o cliente e o pool de conexões do Redis.
+        """
+        try:
+            await self.redis.aclose()
+            await self.pool.disconnect()
+        except Exception as e:
+            logger.error(f"Error closing cache connection: {e}")
+
+
+class LocalTTLCache:
+    """
+    Cache em memória do processo, com tamanho máximo, TTL por chave e despejo LRU.
+    
+    Os valores são mantidos já decodificados e compartilhados entre os chamadores,
+    portanto não devem ser modificados.
+    """
+    
+    def __init__(self, maxsize: int, default_ttl: float):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Obtém um valor do cache local.
+        
+        Args:
+            key: Chave do cache
+        
+        Returns:
+            Tupla (encontrado, valor)
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return False, None
+        
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Armazena um valor no cache local, despejando o item menos usado se necessário.
+        
+        Args:
+            key: Chave do cache
+            value: Valor a ser armazenado
+            ttl: Tempo de vida em segundos (limitado ao TTL padrão do L1)
+        """
+        ttl = min(ttl, self.default_ttl) if ttl else self.default_ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+    
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        self._data.clear()
+    
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache(RedisCache):
+    """
+    Cache em dois níveis: L1 em memória do processo na frente do Redis (L2).
+    
+    Escritas e remoções são propagadas via pub/sub do Redis para que todos os
+    workers descartem a cópia local da chave ao mesmo tempo.
+    """
+    
+    INVALIDATION_CHANNEL = "cache:invalidate"
+    
+    def __init__(self, maxsize: Optional[int] = None, default_ttl: Optional[float] = None):
+        super().__init__()
+        self.local = LocalTTLCache(
+            maxsize=maxsize or settings.CACHE_L1_MAXSIZE,
+            default_ttl=default_ttl or settings.CACHE_L1_TTL,
+        )
+        # Identifica este processo para ignorar as próprias mensagens de invalidação
+        self.instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+    
+    async def get(self, key: str) -> Optional[Any]:
+        found, value = self.local.get(key)
+        if found:
+            return value
+        
+        value = await super().get(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+    
+    async def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        result = {}
+        missing = []
+        for key in keys:
+            found, value = self.local.get(key)
+            if found:
+                result[key] = value
+            else:
+                missing.append(key)
+        
+        if missing:
+            remote = await super().get_many(missing)
+            for key, value in remote.items():
+                self.local.set(key, value)
+            result.update(remote)
+        return result
+    
+    async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        stored = await super().set(key, value, expire)
+        if stored:
+            self.local.set(key, value, expire)
+            await self._publish_invalidation([key])
+        return stored
+    
+    async def set_many(self, mapping: Dict[str, Any], expire: Optional[int] = None) -> bool:
+        stored = await super().set_many(mapping, expire)
+        if stored:
+            for key, value in mapping.items():
+                self.local.set(key, value, expire)
+            await self._publish_invalidation(list(mapping))
+        return stored
+    
+    async def delete(self, key: str) -> bool:
+        self.local.delete(key)
+        deleted = await super().delete(key)
+        await self._publish_invalidation([key])
+        return deleted
+    
+    async def clear(self) -> bool:
+        self.local.clear()
+        cleared = await super().clear()
+        await self._publish_invalidation(["*"])
+        return cleared
+    
+    async def _publish_invalidation(self, keys: list) -> None:
+        try:
+            message = json.dumps({"sender": self.instance_id, "keys": keys})
+            await self.redis.publish(self.INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.error(f"Error publishing cache invalidation: {e}")
+    
+    def _handle_invalidation(self, data: str) -> None:
+        message = json.loads(data)
+        if message.get("sender") == self.instance_id:
+            return
+        
+        for key in message.get("keys", []):
+            if key == "*":
+                self.local.clear()
+            else:
+                self.local.delete(key)
+    
+    async def _listen_invalidations(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.INVALIDATION_CHANNEL)
+                # Mensagens perdidas durante a reconexão tornam o L1 inconsistente
+                self.local.clear()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._handle_invalidation(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+    
+    async def start(self) -> None:
+        """
+        Inicia a escuta das invalidações publicadas pelos outros workers.
+        """
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen_invalidations())
+    
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["l1"] = {
+            "hits": self.local.hits,
+            "misses": self.local.misses,
+            "size": len(self.local),
+            "maxsize": self.local.maxsize,
+        }
+        return stats
+    
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        await super().close()
 
 # Instância global do cache
-cache = RedisCache()
\ No newline at end of file
+cache = TieredCache() if settings.CACHE_L1_ENABLED else RedisCache()
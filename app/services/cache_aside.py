@@ -0,0 +1,138 @@
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from typing import Any, Callable, Optional, Set, Type
+
+from pydantic import BaseModel
+
+from app.services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Chaves com revalidação em andamento neste processo
+_refreshing: Set[str] = set()
+# Referências às tarefas em segundo plano (evita coleta prematura)
+_background_tasks: Set[asyncio.Task] = set()
+
+MAX_KEY_LENGTH = 200
+
+
+def _normalize(value: Any) -> str:
+    """
+    Normaliza um argumento para compor a chave do cache.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return str(value)
+
+
+def build_cache_key(namespace: str, func: Callable, args: tuple, kwargs: dict) -> str:
+    """
+    Monta uma chave de cache estável a partir dos argumentos da chamada.
+
+    Args:
+        namespace: Prefixo da chave (ex.: "ml:search")
+        func: Função decorada
+        args: Argumentos posicionais
+        kwargs: Argumentos nomeados
+
+    Returns:
+        Chave normalizada (com hash quando muito longa)
+    """
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+
+    parts = [
+        f"{name}={_normalize(value)}"
+        for name, value in bound.arguments.items()
+        if name != "self"
+    ]
+    key = f"{namespace}:{'|'.join(parts)}"
+    if len(key) > MAX_KEY_LENGTH:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        key = f"{namespace}:{digest}"
+    return key
+
+
+def _serialize(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, list):
+        return [_serialize(item) for item in value]
+    return value
+
+
+def _deserialize(value: Any, model: Optional[Type[BaseModel]]) -> Any:
+    if model is None or value is None:
+        return value
+    if isinstance(value, list):
+        return [model.model_validate(item) for item in value]
+    return model.model_validate(value)
+
+
+def cached(
+    namespace: str,
+    ttl: int,
+    stale_ttl: int = 0,
+    model: Optional[Type[BaseModel]] = None,
+) -> Callable:
+    """
+    Decorador de cache-aside para métodos assíncronos, com stale-while-revalidate.
+
+    Resultados com até `ttl` segundos são servidos do cache. Entre `ttl` e
+    `ttl + stale_ttl` o valor antigo é devolvido imediatamente e uma única
+    tarefa em segundo plano o atualiza. Resultados vazios (None, [] ou {})
+    não são armazenados, pois os clientes os usam para sinalizar erro.
+
+    Args:
+        namespace: Prefixo das chaves do cache
+        ttl: Tempo (segundos) em que o valor é considerado fresco
+        stale_ttl: Janela adicional (segundos) em que o valor antigo ainda pode ser servido
+        model: Schema pydantic usado para reconstruir o resultado
+
+    Returns:
+        Decorador
+    """
+    def decorator(func: Callable) -> Callable:
+        async def load_and_store(key: str, args: tuple, kwargs: dict) -> Any:
+            result = await func(*args, **kwargs)
+            if result:
+                envelope = {"t": time.time(), "v": _serialize(result)}
+                await cache.set(key, envelope, expire=ttl + stale_ttl)
+            return result
+
+        async def revalidate(key: str, args: tuple, kwargs: dict) -> None:
+            try:
+                # Trava entre workers para que apenas um revalide a chave
+                lock_key = f"lock:revalidate:{key}"
+                if await cache.redis.set(lock_key, "1", nx=True, ex=max(ttl, 1)):
+                    await load_and_store(key, args, kwargs)
+            except Exception as e:
+                logger.error(f"Error revalidating cache key {key}: {e}")
+            finally:
+                _refreshing.discard(key)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = build_cache_key(namespace, func, args, kwargs)
+            envelope = await cache.get(key)
+
+            if envelope is not None:
+                age = time.time() - envelope.get("t", 0)
+                if age > ttl and key not in _refreshing:
+                    _refreshing.add(key)
+                    task = asyncio.create_task(revalidate(key, args, kwargs))
+                    _background_tasks.add(task)
+                    task.add_done_callback(_background_tasks.discard)
+                return _deserialize(envelope.get("v"), model)
+
+            return await load_and_store(key, args, kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,196 @@
+import json
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import Product
+from app.services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Colunas necessárias para montar o documento de contexto
+CONTEXT_COLUMNS = [
+    "id",
+    "platform",
+    "title",
+    "brand",
+    "category",
+    "price",
+    "sale_price",
+    "available",
+    "description",
+    "product_url",
+    "affiliate_url",
+]
+
+_sync_redis: Optional[redis.Redis] = None
+
+
+def _context_key(product_id: int) -> str:
+    return f"context:product:{product_id}"
+
+
+def _redis() -> redis.Redis:
+    # Cliente síncrono para gravar a partir da sincronização (threadpool e workers)
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = redis.Redis.from_url(settings.REDIS_URL, decode_responses=True)
+    return _sync_redis
+
+
+def _number(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def _truncate(text: Optional[str], limit: int) -> Optional[str]:
+    if not text:
+        return None
+    text = " ".join(text.split())
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "…"
+
+
+def build_context_document(product: Dict[str, Any]) -> str:
+    """
+    Monta o documento de contexto compacto de um produto, já serializado.
+
+    Campos vazios são omitidos e a descrição é resumida para economizar tokens.
+
+    Args:
+        product: Dicionário com as colunas de CONTEXT_COLUMNS
+
+    Returns:
+        JSON compacto do produto
+    """
+    document = {
+        "id": product["id"],
+        "platform": product.get("platform"),
+        "title": product.get("title"),
+        "brand": product.get("brand"),
+        "category": product.get("category"),
+        "price": _number(product.get("price")),
+        "sale_price": _number(product.get("sale_price")),
+        "available": product.get("available"),
+        # Link de afiliado tem prioridade sobre o link original
+        "url": product.get("affiliate_url") or product.get("product_url"),
+        "summary": _truncate(product.get("description"), settings.CONTEXT_DESCRIPTION_CHARS),
+    }
+    document = {key: value for key, value in document.items() if value is not None}
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+
+
+def store_context_documents(products: Iterable[Dict[str, Any]]) -> int:
+    """
+    Pré-calcula e grava no Redis os documentos de contexto (chamado na sincronização).
+
+    Falhas são registradas sem interromper quem chamou.
+
+    Args:
+        products: Dicionários com as colunas de CONTEXT_COLUMNS
+
+    Returns:
+        Quantidade de documentos gravados
+    """
+    products = [product for product in products if product.get("id") is not None]
+    if not products:
+        return 0
+    try:
+        pipe = _redis().pipeline(transaction=False)
+        for product in products:
+            pipe.set(_context_key(product["id"]), build_context_document(product), ex=settings.CONTEXT_DOC_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.error(f"Error storing context documents: {e}")
+        return 0
+    return len(products)
+
+
+def invalidate_context_documents(product_ids: Sequence[int]) -> None:
+    """
+    Descarta os documentos de produtos alterados fora da sincronização
+    (ex.: importação de links de afiliado); são recriados na próxima leitura.
+    """
+    if not product_ids:
+        return
+    try:
+        _redis().delete(*(_context_key(product_id) for product_id in product_ids))
+    except Exception as e:
+        logger.error(f"Error invalidating context documents: {e}")
+
+
+async def get_context_documents(db: AsyncSession, product_ids: Sequence[int]) -> List[str]:
+    """
+    Obtém os documentos de contexto na ordem pedida, com um único MGET.
+
+    Documentos ausentes são montados a partir do banco e gravados no Redis.
+
+    Args:
+        db: Sessão assíncrona do banco de dados
+        product_ids: IDs dos produtos
+
+    Returns:
+        Documentos JSON (produtos inexistentes são ignorados)
+    """
+    if not product_ids:
+        return []
+
+    try:
+        values = await cache.redis.mget([_context_key(product_id) for product_id in product_ids])
+    except Exception as e:
+        logger.error(f"Error reading context documents: {e}")
+        values = [None] * len(product_ids)
+    documents = dict(zip(product_ids, values))
+
+    missing = [product_id for product_id, value in documents.items() if value is None]
+    if missing:
+        columns = [getattr(Product, column) for column in CONTEXT_COLUMNS]
+        rows = (await db.execute(select(*columns).where(Product.id.in_(missing)))).mappings().all()
+        built: List[Tuple[int, str]] = [(row["id"], build_context_document(dict(row))) for row in rows]
+        documents.update(built)
+        if built:
+            try:
+                pipe = cache.redis.pipeline(transaction=False)
+                for product_id, document in built:
+                    pipe.set(_context_key(product_id), document, ex=settings.CONTEXT_DOC_TTL)
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Error storing context documents: {e}")
+
+    return [documents[product_id] for product_id in product_ids if documents.get(product_id)]
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimativa barata de tokens (caracteres / CONTEXT_CHARS_PER_TOKEN).
+    """
+    return len(text) // settings.CONTEXT_CHARS_PER_TOKEN + 1
+
+
+def pack_context(documents: Sequence[str], max_tokens: int) -> Tuple[str, int, bool]:
+    """
+    Concatena os documentos em uma lista JSON até o orçamento de tokens.
+
+    Args:
+        documents: Documentos JSON, do mais para o menos relevante
+        max_tokens: Orçamento de tokens
+
+    Returns:
+        Lista JSON, tokens estimados e se algum documento ficou de fora
+    """
+    selected: List[str] = []
+    used = 1
+    for document in documents:
+        cost = estimate_tokens(document)
+        if used + cost > max_tokens:
+            return "[" + ",".join(selected) + "]", used, True
+        selected.append(document)
+        used += cost
+    return "[" + ",".join(selected) + "]", used, False
@@ -0,0 +1,206 @@
+import logging
+import math
+import re
+import unicodedata
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.product import Product
+from app.services.vector_index import vector_index
+
+logger = logging.getLogger(__name__)
+
+# Peso de cada campo do produto no embedding
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "brand": 2.0,
+    "category": 1.0,
+    "description": 1.0,
+}
+
+# Descrições longas pouco acrescentam ao embedding
+MAX_DESCRIPTION_CHARS = 2000
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Converte para minúsculas e remove acentos.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in text if not unicodedata.combining(char))
+
+
+def _features(text: str) -> List[str]:
+    # Palavras inteiras + trigramas de caracteres (tolerância a variações e erros)
+    features = []
+    for token in _TOKEN_RE.findall(normalize_text(text)):
+        features.append(token)
+        padded = f"#{token}#"
+        features.extend(f"~{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+def _hash_feature(feature: str, dim: int) -> Tuple[int, float]:
+    # crc32 é estável entre processos (ao contrário de hash())
+    value = zlib.crc32(feature.encode("utf-8"))
+    return value % dim, 1.0 if (value >> 31) & 1 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Gera embeddings de produtos sem modelo nem rede, com o truque do hashing.
+
+    Palavras e trigramas de caracteres de cada campo são mapeados para
+    `dim` posições (com sinal), ponderados pelo campo e por tf sublinear, e o
+    vetor final é normalizado (norma L2 = 1), de modo que o produto interno
+    é a similaridade de cosseno.
+    """
+
+    def __init__(self, dim: Optional[int] = None):
+        self.dim = dim or settings.EMBEDDING_DIM
+
+    def _accumulate(self, fields: Dict[str, float], text: str, weight: float) -> None:
+        counts: Dict[str, int] = {}
+        for feature in _features(text):
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, count in counts.items():
+            fields[feature] = fields.get(feature, 0.0) + weight * (1.0 + math.log(count))
+
+    def _to_matrix(self, documents: Sequence[Dict[str, float]]) -> np.ndarray:
+        rows, cols, values = [], [], []
+        for row, features in enumerate(documents):
+            for feature, weight in features.items():
+                col, sign = _hash_feature(feature, self.dim)
+                rows.append(row)
+                cols.append(col)
+                values.append(sign * weight)
+
+        matrix = np.zeros((len(documents), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(matrix, (np.asarray(rows), np.asarray(cols)), np.asarray(values, dtype=np.float32))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Gera os embeddings de textos livres (ex.: consultas).
+
+        Args:
+            texts: Textos
+
+        Returns:
+            Matriz float32 (len(texts), dim)
+        """
+        documents = []
+        for text in texts:
+            features: Dict[str, float] = {}
+            self._accumulate(features, text or "", 1.0)
+            documents.append(features)
+        return self._to_matrix(documents)
+
+    def embed_products(self, products: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Gera os embeddings de produtos a partir de título, marca, categoria e descrição.
+
+        Args:
+            products: Dicionários com os campos do produto
+
+        Returns:
+            Matriz float32 (len(products), dim)
+        """
+        documents = []
+        for product in products:
+            features: Dict[str, float] = {}
+            for field, weight in FIELD_WEIGHTS.items():
+                value = product.get(field) or ""
+                if field == "description":
+                    value = value[:MAX_DESCRIPTION_CHARS]
+                self._accumulate(features, str(value), weight)
+            documents.append(features)
+        return self._to_matrix(documents)
+
+
+# Instância global do gerador de embeddings
+embedder = HashingEmbedder()
+
+
+def index_products(products: Iterable[Dict[str, Any]]) -> int:
+    """
+    Atualiza o índice vetorial com produtos novos ou alterados.
+
+    Falhas são registradas sem interromper quem chamou (ex.: a sincronização).
+
+    Args:
+        products: Dicionários com `id` e os campos do produto
+
+    Returns:
+        Quantidade de produtos indexados
+    """
+    if not settings.VECTOR_INDEX_ENABLED:
+        return 0
+
+    products = [product for product in products if product.get("id") is not None]
+    if not products:
+        return 0
+
+    try:
+        vectors = embedder.embed_products(products)
+        vector_index.upsert([product["id"] for product in products], vectors)
+    except Exception as e:
+        logger.error(f"Error updating vector index: {e}")
+        return 0
+    return len(products)
+
+
+def semantic_search(query: str, k: int = 10) -> List[Tuple[int, float]]:
+    """
+    Busca os produtos semanticamente mais próximos de uma consulta.
+
+    Args:
+        query: Texto da consulta
+        k: Número de resultados
+
+    Returns:
+        Pares (ID do produto, similaridade), do mais parecido
+    """
+    vector = embedder.embed_texts([query])[0]
+    return vector_index.search(vector, k=k)
+
+
+def rebuild_vector_index(batch_size: Optional[int] = None) -> int:
+    """
+    Reconstrói o índice vetorial a partir de todos os produtos do banco.
+
+    Args:
+        batch_size: Produtos lidos e indexados por lote (padrão em settings)
+
+    Returns:
+        Quantidade de produtos indexados
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    stmt = (
+        select(Product.id, Product.title, Product.brand, Product.category, Product.description)
+        .order_by(Product.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    vector_index.clear()
+    total = 0
+    db = SessionLocal()
+    try:
+        for partition in db.execute(stmt).partitions():
+            products = [dict(row._mapping) for row in partition]
+            vector_index.upsert([product["id"] for product in products], embedder.embed_products(products))
+            total += len(products)
+            logger.info(f"Vector index rebuild: {total} products indexed")
+    finally:
+        db.close()
+    return total
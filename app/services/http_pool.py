@@ -0,0 +1,113 @@
+import asyncio
+import logging
+from typing import Any, Dict
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_available() -> bool:
+    """
+    Verifica se o pacote `h2` está instalado (necessário para HTTP/2 no httpx).
+    """
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class HTTPClientRegistry:
+    """
+    Registro de clientes HTTP compartilhados, um pool de conexões por plataforma.
+
+    Os clientes são criados sob demanda, reutilizados por todas as requisições
+    do processo e fechados no shutdown da aplicação (lifespan).
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._limits: Dict[str, httpx.Limits] = {}
+
+    def _build_client(self, platform: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+        http2 = settings.HTTP_ENABLE_HTTP2
+        if http2 and not _http2_available():
+            logger.warning("HTTP/2 solicitado, mas o pacote 'h2' não está instalado; usando HTTP/1.1")
+            http2 = False
+
+        self._limits[platform] = limits
+        return httpx.AsyncClient(
+            timeout=settings.HTTP_TIMEOUT,
+            limits=limits,
+            http2=http2,
+        )
+
+    def get(self, platform: str) -> httpx.AsyncClient:
+        """
+        Obtém o cliente HTTP compartilhado de uma plataforma.
+
+        Args:
+            platform: Nome da plataforma
+
+        Returns:
+            Cliente HTTP com pool de conexões persistentes
+        """
+        client = self._clients.get(platform)
+        if client is None or client.is_closed:
+            client = self._build_client(platform)
+            self._clients[platform] = client
+        return client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retorna métricas de saturação dos pools de conexão.
+
+        Returns:
+            Dicionário por plataforma com conexões ativas, ociosas e requisições em espera
+        """
+        result = {}
+        for platform, client in self._clients.items():
+            limits = self._limits.get(platform)
+            # O httpx não expõe o pool publicamente; lemos o pool do httpcore
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for conn in connections if conn.is_idle())
+            requests = list(getattr(pool, "_requests", []) or [])
+            waiting = sum(1 for request in requests if request.is_queued())
+            max_connections = limits.max_connections if limits else None
+
+            result[platform] = {
+                "closed": client.is_closed,
+                "connections": len(connections),
+                "active": len(connections) - idle,
+                "idle": idle,
+                "waiting": waiting,
+                "max_connections": max_connections,
+                "max_keepalive_connections": limits.max_keepalive_connections if limits else None,
+                "saturation": round((len(connections) - idle) / max_connections, 4) if max_connections else None,
+            }
+        return result
+
+    async def aclose(self) -> None:
+        """
+        Fecha todos os clientes HTTP registrados.
+        """
+        clients = list(self._clients.values())
+        self._clients.clear()
+        results = await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+        for error in results:
+            if isinstance(error, Exception):
+                logger.error(f"Error closing HTTP client: {error}")
+
+
+# Instância global do registro de clientes HTTP
+http_clients = HTTPClientRegistry()
@@ -0,0 +1,192 @@
+import csv
+import io
+import json
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.product import Product
+
+# Colunas exportadas para geração manual de links de afiliado
+EXPORT_COLUMNS = ["product_id", "external_id", "product_url"]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def iter_pending_products(
+    platform: str,
+    limit: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> Iterator[Sequence[Any]]:
+    """
+    Lê os produtos sem link de afiliado em lotes, com cursor do lado do servidor.
+
+    Apenas as colunas exportadas são projetadas, sem carregar objetos ORM.
+
+    Args:
+        platform: Plataforma de afiliados
+        limit: Número máximo de produtos (None para todos)
+        batch_size: Linhas por lote (padrão em settings)
+
+    Yields:
+        Lotes de linhas (id, external_id, product_url)
+    """
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    stmt = (
+        select(Product.id, Product.external_id, Product.product_url)
+        .where(Product.platform == platform, Product.affiliate_url == None)
+        .order_by(Product.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt)
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+def _csv_chunks(batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _ndjson_chunks(batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    for batch in batches:
+        lines = [json.dumps(dict(zip(EXPORT_COLUMNS, row))) for row in batch]
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _json_chunks(batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    yield b"["
+    first = True
+    for batch in batches:
+        items = ",".join(json.dumps(dict(zip(EXPORT_COLUMNS, row))) for row in batch)
+        if not items:
+            continue
+        yield (items if first else "," + items).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Destino de escrita que acumula os bytes até serem consumidos pelo stream.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_chunks(batches: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("product_id", pa.int64()),
+        ("external_id", pa.string()),
+        ("product_url", pa.string()),
+    ])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        # Cada lote vira um row group, enviado assim que é escrito
+        for batch in batches:
+            columns = list(zip(*batch)) if batch else [[], [], []]
+            writer.write_table(pa.Table.from_arrays([pa.array(c) for c in columns], schema=schema))
+            data = sink.drain()
+            if data:
+                yield data
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def _gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=31)  # 31: formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+FORMATTERS: Dict[str, Callable[[Iterable[Sequence[Any]]], Iterator[bytes]]] = {
+    "csv": _csv_chunks,
+    "ndjson": _ndjson_chunks,
+    "json": _json_chunks,
+    "parquet": _parquet_chunks,
+}
+
+
+def parquet_available() -> bool:
+    """
+    Verifica se o pacote opcional `pyarrow` está instalado.
+    """
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def export_pending_products(
+    platform: str,
+    format: str,
+    limit: Optional[int] = None,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """
+    Gera a exportação dos produtos sem link de afiliado em blocos de bytes.
+
+    Args:
+        platform: Plataforma de afiliados
+        format: csv, ndjson, json ou parquet
+        limit: Número máximo de produtos (None para todos)
+        compress: Se deve compactar a saída com gzip
+
+    Returns:
+        Iterador de blocos de bytes, pronto para um StreamingResponse
+    """
+    chunks = FORMATTERS[format](iter_pending_products(platform, limit=limit))
+    if compress:
+        chunks = _gzip_chunks(chunks)
+    return chunks
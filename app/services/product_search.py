@@ -0,0 +1,125 @@
+from typing import List, Optional
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.product import Product
+
+SEARCH_MODES = ("fulltext", "fuzzy")
+
+
+def _normalized(expression):
+    # Mesma expressão do índice ix_products_title_trgm (minúsculas, sem acentos)
+    return func.lower(func.immutable_unaccent(expression))
+
+
+def _apply_filters(
+    stmt: Select,
+    platform: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+) -> Select:
+    if platform:
+        stmt = stmt.where(Product.platform == platform)
+    if category:
+        stmt = stmt.where(Product.category == category)
+    if min_price is not None:
+        stmt = stmt.where(Product.price >= min_price)
+    if max_price is not None:
+        stmt = stmt.where(Product.price <= max_price)
+    if available is not None:
+        stmt = stmt.where(Product.available == available)
+    return stmt
+
+
+async def search_local_products(
+    db: AsyncSession,
+    query: str,
+    platform: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[Product]:
+    """
+    Busca textual no catálogo local, ordenada por relevância.
+
+    Usa o tsvector em português de título, marca e descrição (índice GIN), com
+    a sintaxe de busca web (aspas para frases, "-" para excluir termos).
+
+    Args:
+        db: Sessão assíncrona do banco de dados
+        query: Termo de busca
+        platform: Plataforma (opcional)
+        category: Categoria (opcional)
+        min_price: Preço mínimo (opcional)
+        max_price: Preço máximo (opcional)
+        available: Disponibilidade (opcional)
+        limit: Número máximo de resultados
+        offset: Número de resultados a pular
+
+    Returns:
+        Produtos encontrados, do mais para o menos relevante
+    """
+    ts_query = func.websearch_to_tsquery("portuguese", query)
+    rank = func.ts_rank_cd(Product.search_vector, ts_query)
+
+    stmt = select(Product).where(Product.search_vector.bool_op("@@")(ts_query))
+    stmt = _apply_filters(stmt, platform, category, min_price, max_price, available)
+
+    stmt = stmt.order_by(rank.desc(), Product.id).limit(limit).offset(offset)
+    return list((await db.scalars(stmt)).all())
+
+
+async def search_similar_products(
+    db: AsyncSession,
+    query: str,
+    platform: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    available: Optional[bool] = None,
+    threshold: Optional[float] = None,
+    limit: int = 20,
+    offset: int = 0,
+) -> List[Product]:
+    """
+    Busca aproximada por título, tolerante a erros de digitação e acentos.
+
+    Compara trigramas do termo com as palavras do título (word_similarity do
+    pg_trgm), usando o índice GIN ix_products_title_trgm.
+
+    Args:
+        db: Sessão assíncrona do banco de dados
+        query: Termo de busca (ex.: "geladera", "samsumg")
+        platform: Plataforma (opcional)
+        category: Categoria (opcional)
+        min_price: Preço mínimo (opcional)
+        max_price: Preço máximo (opcional)
+        available: Disponibilidade (opcional)
+        threshold: Similaridade mínima entre 0 e 1 (padrão em settings)
+        limit: Número máximo de resultados
+        offset: Número de resultados a pular
+
+    Returns:
+        Produtos encontrados, do mais para o menos parecido
+    """
+    threshold = settings.SEARCH_FUZZY_THRESHOLD if threshold is None else threshold
+    term = _normalized(query)
+    title = _normalized(Product.title)
+
+    # O operador <% só usa o índice com o limite configurado na sessão;
+    # set_config(..., true) vale apenas para a transação atual
+    await db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
+
+    stmt = select(Product).where(term.bool_op("<%")(title))
+    stmt = _apply_filters(stmt, platform, category, min_price, max_price, available)
+
+    similarity = func.word_similarity(term, title)
+    stmt = stmt.order_by(similarity.desc(), Product.id).limit(limit).offset(offset)
+    return list((await db.scalars(stmt)).all())
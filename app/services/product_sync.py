@@ -0,0 +1,158 @@
+import hashlib
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.product import Product
+from app.schemas.product import ProductCreate
+from app.services.context_service import store_context_documents
+from app.services.embedding_service import index_products
+
+logger = logging.getLogger(__name__)
+
+# Colunas atualizadas quando o produto já existe
+SYNC_COLUMNS = [
+    "title",
+    "description",
+    "price",
+    "sale_price",
+    "image_url",
+    "product_url",
+    "category",
+    "brand",
+    "available",
+]
+
+
+def compute_content_hash(row: Dict[str, Any]) -> str:
+    """
+    Calcula a impressão digital (SHA-1) dos campos sincronizados de um produto.
+
+    Args:
+        row: Dados do produto vindos da plataforma
+
+    Returns:
+        Hash hexadecimal de 40 caracteres
+    """
+    payload = json.dumps([row.get(column) for column in SYNC_COLUMNS], default=str, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _chunks(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _upsert_chunk(db: Session, rows: List[Dict[str, Any]], columns: List[str]) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """
+    Executa um único INSERT ... ON CONFLICT DO UPDATE para um lote de produtos.
+
+    Linhas existentes só são atualizadas quando o content_hash (ou a loja)
+    mudou; as inalteradas não são escritas nem retornadas pelo RETURNING.
+
+    Retorna as contagens e as linhas gravadas (com o `id` atribuído).
+    """
+    stmt = insert(Product).values(rows)
+    excluded = stmt.excluded
+    table = Product.__table__
+
+    compared = ["content_hash"] + [column for column in columns if column not in SYNC_COLUMNS]
+    changed = or_(*(table.c[column].is_distinct_from(excluded[column]) for column in compared))
+    update_values = {column: excluded[column] for column in columns + ["content_hash"]}
+    update_values["updated_at"] = func.now()
+
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_products_platform_external_id",
+        set_=update_values,
+        where=changed,
+    ).returning(
+        Product.id,
+        Product.platform,
+        Product.external_id,
+        Product.affiliate_url,
+        # xmax = 0 indica uma linha recém-inserida (e não atualizada)
+        literal_column("(xmax = 0)").label("inserted"),
+    )
+
+    result = db.execute(stmt).all()
+    inserted = sum(1 for row in result if row.inserted)
+    updated = len(result) - inserted
+
+    by_key = {(row["platform"], row["external_id"]): row for row in rows}
+    written = [
+        {**by_key[(row.platform, row.external_id)], "id": row.id, "affiliate_url": row.affiliate_url}
+        for row in result
+    ]
+    return {
+        "inserted": inserted,
+        "updated": updated,
+        "unchanged": len(rows) - inserted - updated,
+    }, written
+
+
+def bulk_upsert_products(
+    db: Session,
+    products: Iterable[ProductCreate],
+    affiliate_store_id: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Insere ou atualiza produtos em lote, um comando por lote.
+
+    Args:
+        db: Sessão do banco de dados
+        products: Produtos obtidos da plataforma
+        affiliate_store_id: Loja de origem dos produtos (opcional)
+        chunk_size: Produtos por comando (padrão em settings)
+
+    Returns:
+        Contagem de produtos inseridos, atualizados e inalterados (escritas evitadas)
+    """
+    chunk_size = chunk_size or settings.SYNC_UPSERT_CHUNK_SIZE
+    columns = list(SYNC_COLUMNS)
+    if affiliate_store_id is not None:
+        columns.append("affiliate_store_id")
+
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    for chunk in _chunks(products, chunk_size):
+        # Um mesmo produto não pode aparecer duas vezes no mesmo ON CONFLICT
+        rows = {}
+        for product in chunk:
+            row = product.model_dump()
+            row["content_hash"] = compute_content_hash(row)
+            if affiliate_store_id is not None:
+                row["affiliate_store_id"] = affiliate_store_id
+            rows[(row["platform"], row["external_id"])] = row
+
+        try:
+            chunk_counts, written = _upsert_chunk(db, list(rows.values()), columns)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Produtos novos ou alterados entram na busca semântica e no contexto dos agentes
+        index_products(written)
+        store_context_documents(written)
+
+        chunk_counts["unchanged"] += len(chunk) - len(rows)
+        for key, value in chunk_counts.items():
+            counts[key] += value
+
+    logger.info(
+        f"Upsert concluído: {counts['inserted']} inseridos, "
+        f"{counts['updated']} atualizados, {counts['unchanged']} inalterados (escritas evitadas)"
+    )
+    return counts
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict
+
+from app.core.config import settings
+from app.services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Agrupa chamadas concorrentes idênticas em uma única execução.
+
+    Enquanto uma chamada para uma chave está em andamento, as demais aguardam
+    o mesmo resultado (ou a mesma exceção) em vez de repetir o trabalho.
+    Opcionalmente, uma trava curta no Redis estende o agrupamento entre workers.
+    """
+
+    LOCK_PREFIX = "sf:lock:"
+    RESULT_PREFIX = "sf:result:"
+
+    def __init__(self, distributed: bool = False):
+        self.distributed = distributed
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa `fn` uma única vez para todas as chamadas concorrentes com a mesma chave.
+
+        Args:
+            key: Identificador da operação
+            fn: Função assíncrona que produz o resultado (deve ser serializável em JSON
+                quando o modo distribuído estiver ativo)
+
+        Returns:
+            Resultado compartilhado da operação
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            runner = self._run_distributed(key, fn) if self.distributed else fn()
+            task = asyncio.ensure_future(runner)
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # shield: o cancelamento de um chamador não cancela a chamada compartilhada
+        return await asyncio.shield(task)
+
+    async def _run_distributed(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        lock_key = f"{self.LOCK_PREFIX}{digest}"
+        result_key = f"{self.RESULT_PREFIX}{digest}"
+        timeout = settings.SINGLE_FLIGHT_LOCK_TIMEOUT
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await cache.redis.set(lock_key, token, nx=True, px=int(timeout * 1000))
+        except Exception as e:
+            logger.error(f"Error acquiring single-flight lock: {e}")
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                await cache.redis.set(
+                    result_key, json.dumps(result), ex=settings.SINGLE_FLIGHT_RESULT_TTL
+                )
+                return result
+            finally:
+                if await cache.redis.get(lock_key) == token:
+                    await cache.redis.delete(lock_key)
+
+        # Outro worker está buscando: aguarda o resultado publicado por ele
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            value, locked = await asyncio.gather(
+                cache.redis.get(result_key), cache.redis.exists(lock_key)
+            )
+            if value is not None:
+                self.coalesced += 1
+                return json.loads(value)
+            if not locked:
+                break
+            await asyncio.sleep(settings.SINGLE_FLIGHT_POLL_INTERVAL)
+
+        return await fn()
+
+    def stats(self) -> Dict[str, int]:
+        return {"inflight": len(self._inflight), "coalesced": self.coalesced}
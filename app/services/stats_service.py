@@ -0,0 +1,89 @@
+import logging
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Select, func, select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.product import Product
+from app.services.cache import cache
+from app.services.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+STATS_CACHE_KEY = "stats:affiliate_coverage"
+
+# Evita recálculos simultâneos quando o cache expira
+_single_flight = SingleFlight()
+
+
+def _stats_query() -> Select:
+    return select(
+        Product.platform,
+        func.count().label("total"),
+        func.count().filter(Product.affiliate_url != None).label("with_affiliate"),
+    ).group_by(Product.platform)
+
+
+def _rows_to_stats(rows) -> Dict[str, Dict[str, int]]:
+    return {
+        row.platform: {"total_products": row.total, "with_affiliate_url": row.with_affiliate}
+        for row in rows
+    }
+
+
+async def get_affiliate_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Obtém a cobertura de links de afiliado por plataforma, com cache de TTL curto.
+
+    O recálculo compartilhado usa uma sessão própria, e não a de quem chegou
+    primeiro: o cancelamento de uma requisição não afeta as demais que aguardam.
+
+    Returns:
+        Dicionário plataforma -> {total_products, with_affiliate_url}
+    """
+    stats = await cache.get(STATS_CACHE_KEY)
+    if stats is not None:
+        return stats
+
+    async def load() -> Dict[str, Dict[str, int]]:
+        async with AsyncSessionLocal() as db:
+            result = _rows_to_stats(await db.execute(_stats_query()))
+        await cache.set(STATS_CACHE_KEY, result, expire=settings.STATS_CACHE_TTL)
+        return result
+
+    return await _single_flight.do(STATS_CACHE_KEY, load)
+
+
+def summarize_stats(stats: Dict[str, Dict[str, int]], platform: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Consolida as estatísticas de uma plataforma (ou de todas).
+
+    Args:
+        stats: Estatísticas por plataforma
+        platform: Plataforma desejada (None para o total geral)
+
+    Returns:
+        Totais com e sem link de afiliado e percentual de cobertura
+    """
+    if platform is not None:
+        selected = [stats.get(platform, {})]
+    else:
+        selected = list(stats.values())
+
+    total = sum(item.get("total_products", 0) for item in selected)
+    with_affiliate = sum(item.get("with_affiliate_url", 0) for item in selected)
+
+    return {
+        "total_products": total,
+        "with_affiliate_url": with_affiliate,
+        "without_affiliate_url": total - with_affiliate,
+        "coverage_percentage": round((with_affiliate / total * 100) if total > 0 else 0, 2),
+    }
+
+
+async def invalidate_affiliate_stats() -> None:
+    """
+    Descarta as estatísticas em cache (ex.: após importações em massa).
+    """
+    await cache.delete(STATS_CACHE_KEY)
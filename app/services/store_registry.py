@@ -0,0 +1,157 @@
+# app/services/store_registry.py
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Type
+
+from starlette.concurrency import run_in_threadpool
+
+from app.clients.base_client import BaseMarketplaceClient
+from app.clients.mercadolivre_client import MercadoLivreClient
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.affiliate_store import AffiliateStore
+from app.services.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Clientes disponíveis por plataforma
+STORE_CLIENTS: Dict[str, Type[BaseMarketplaceClient]] = {
+    "mercadolivre": MercadoLivreClient,
+    # Adicionar mais plataformas conforme necessário
+}
+
+
+class StoreRegistry:
+    """
+    Registro em memória das lojas afiliadas ativas e de seus clientes.
+
+    As lojas são carregadas uma vez do banco e mantidas no processo. Alterações
+    nas lojas incrementam uma versão no Redis; cada worker compara a versão
+    periodicamente e recarrega a lista apenas quando ela muda.
+    """
+
+    VERSION_KEY = "affiliate_stores:version"
+
+    def __init__(self):
+        self._stores: Dict[int, Dict[str, Any]] = {}
+        self._clients: Dict[int, BaseMarketplaceClient] = {}
+        self._version: Optional[str] = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _load_stores() -> Dict[int, Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            stores = db.query(AffiliateStore).filter(AffiliateStore.active == True).all()
+            return {
+                store.id: {
+                    "id": store.id,
+                    "name": store.name,
+                    "platform": store.platform,
+                    "api_credentials": store.api_credentials or {},
+                }
+                for store in stores
+            }
+        finally:
+            db.close()
+
+    async def _current_version(self) -> Optional[str]:
+        try:
+            return await cache.redis.get(self.VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Error reading affiliate stores version: {e}")
+            return self._version
+
+    async def _reload(self, version: Optional[str]) -> None:
+        stores = await run_in_threadpool(self._load_stores)
+        self._stores = stores
+        # Clientes são recriados sob demanda com as credenciais atuais
+        self._clients = {}
+        self._version = version
+        self._loaded = True
+        logger.info(f"Affiliate store registry loaded: {len(stores)} active stores (version {version})")
+
+    async def refresh(self) -> None:
+        """
+        Recarrega as lojas ativas do banco de dados.
+        """
+        async with self._lock:
+            await self._reload(await self._current_version())
+            self._checked_at = time.monotonic()
+
+    async def ensure_fresh(self) -> None:
+        """
+        Recarrega as lojas se a versão publicada mudou (verificada no máximo
+        uma vez a cada REGISTRY_VERSION_CHECK_INTERVAL segundos).
+        """
+        if self._loaded and time.monotonic() - self._checked_at < settings.REGISTRY_VERSION_CHECK_INTERVAL:
+            return
+
+        version = await self._current_version()
+        self._checked_at = time.monotonic()
+        if self._loaded and version == self._version:
+            return
+
+        async with self._lock:
+            # Outra requisição pode ter recarregado enquanto aguardávamos
+            if self._loaded and version == self._version:
+                return
+            await self._reload(version)
+
+    async def invalidate(self) -> None:
+        """
+        Publica uma nova versão das lojas, forçando a recarga em todos os workers.
+        """
+        try:
+            await cache.redis.incr(self.VERSION_KEY)
+        except Exception as e:
+            logger.error(f"Error publishing affiliate stores version: {e}")
+        # Este worker recarrega na próxima consulta
+        self._loaded = False
+
+    async def get_store(self, store_id: int) -> Dict[str, Any]:
+        """
+        Obtém os dados de uma loja ativa.
+
+        Raises:
+            ValueError: Se a loja não existir ou não estiver ativa
+        """
+        await self.ensure_fresh()
+        store = self._stores.get(store_id)
+        if store is None:
+            raise ValueError(f"Store with ID {store_id} not found or not active")
+        return store
+
+    async def get_client(self, store_id: int) -> BaseMarketplaceClient:
+        """
+        Obtém o cliente de uma loja ativa, criando-o na primeira utilização.
+
+        Raises:
+            ValueError: Se a loja não existir, não estiver ativa ou a plataforma não for suportada
+        """
+        store = await self.get_store(store_id)
+        client = self._clients.get(store_id)
+        if client is None:
+            client_class = STORE_CLIENTS.get(store["platform"])
+            if client_class is None:
+                raise ValueError(f"Unsupported affiliate platform: {store['platform']}")
+            client = client_class(store["api_credentials"])
+            self._clients[store_id] = client
+        return client
+
+    async def list_stores(self, platform: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Lista as lojas ativas, opcionalmente filtradas por plataforma.
+        """
+        await self.ensure_fresh()
+        return [
+            store for store in self._stores.values()
+            if platform is None or store["platform"] == platform
+        ]
+
+
+# Instância global do registro de lojas
+store_registry = StoreRegistry()
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from redis.exceptions import WatchError
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.sync_config import SyncTerm, get_sync_concurrency, get_sync_terms
+from app.db.session import SessionLocal
+from app.schemas.product import ProductCreate
+from app.services.affiliate_clients import get_affiliate_client
+from app.services.cache import cache
+from app.services.product_sync import bulk_upsert_products
+from app.services.stats_service import invalidate_affiliate_stats
+
+logger = logging.getLogger(__name__)
+
+
+def _save_products(products: List[ProductCreate]) -> Dict[str, int]:
+    db = SessionLocal()
+    try:
+        return bulk_upsert_products(db, products)
+    finally:
+        db.close()
+
+
+class SyncScheduler:
+    """
+    Agendador da sincronização periódica de produtos, executado no processo da API.
+
+    Os termos vêm de app/core/sync_config.py. A cada ciclo, os termos cujo
+    intervalo venceu são buscados diretamente nos clientes das plataformas,
+    com um limite de buscas simultâneas por plataforma, e gravados com upsert
+    em lote. Com vários workers, apenas o que detém o lock de líder no Redis
+    executa os ciclos.
+    """
+
+    LEADER_KEY = "sync:scheduler:leader"
+    LAST_RUN_KEY = "sync:scheduler:last_run"
+
+    def __init__(self):
+        self.instance_id = uuid.uuid4().hex
+        self._task: Optional[asyncio.Task] = None
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._last_pass: Optional[Dict[str, Any]] = None
+
+    def _semaphore(self, platform: str) -> asyncio.Semaphore:
+        if platform not in self._semaphores:
+            self._semaphores[platform] = asyncio.Semaphore(get_sync_concurrency(platform))
+        return self._semaphores[platform]
+
+    async def _acquire_leadership(self) -> bool:
+        try:
+            acquired = await cache.redis.set(
+                self.LEADER_KEY, self.instance_id, nx=True, ex=settings.SYNC_SCHEDULER_LEADER_TTL
+            )
+            if acquired:
+                return True
+        except Exception as e:
+            logger.error(f"Error acquiring sync scheduler leadership: {e}")
+            return False
+        return await self._renew_leadership()
+
+    async def _renew_leadership(self) -> bool:
+        # Renova o mandato apenas se ainda pertencer a este processo (WATCH/MULTI:
+        # se outro processo assumir entre a leitura e o EXPIRE, a transação é descartada)
+        try:
+            async with cache.redis.pipeline(transaction=True) as pipe:
+                await pipe.watch(self.LEADER_KEY)
+                if await pipe.get(self.LEADER_KEY) != self.instance_id:
+                    return False
+                pipe.multi()
+                pipe.expire(self.LEADER_KEY, settings.SYNC_SCHEDULER_LEADER_TTL)
+                await pipe.execute()
+                return True
+        except WatchError:
+            return False
+        except Exception as e:
+            logger.error(f"Error renewing sync scheduler leadership: {e}")
+            return False
+
+    async def _keep_leadership(self) -> None:
+        # Renova o mandato durante o ciclo; retorna quando a liderança for perdida
+        interval = settings.SYNC_SCHEDULER_LEADER_TTL / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await self._renew_leadership():
+                return
+
+    async def _run_as_leader(self) -> None:
+        """
+        Executa um ciclo renovando a liderança em segundo plano.
+
+        Se a renovação falhar, o ciclo é interrompido para que dois processos
+        não sincronizem as mesmas lojas ao mesmo tempo.
+        """
+        pass_task = asyncio.create_task(self.run_once())
+        renew_task = asyncio.create_task(self._keep_leadership())
+        try:
+            await asyncio.wait({pass_task, renew_task}, return_when=asyncio.FIRST_COMPLETED)
+            if not pass_task.done():
+                logger.warning("Sync scheduler leadership lost; stopping the current pass")
+                return
+            pass_task.result()
+        finally:
+            for task in (pass_task, renew_task):
+                task.cancel()
+            await asyncio.gather(pass_task, renew_task, return_exceptions=True)
+
+    async def _due_terms(self, terms: List[SyncTerm]) -> List[SyncTerm]:
+        try:
+            last_runs = await cache.redis.hgetall(self.LAST_RUN_KEY)
+        except Exception as e:
+            logger.error(f"Error reading sync schedule: {e}")
+            last_runs = {}
+        now = time.time()
+        return [term for term in terms if now - float(last_runs.get(term.key, 0)) >= term.interval]
+
+    async def sync_term(self, term: SyncTerm) -> Dict[str, Any]:
+        """
+        Busca um termo na plataforma e grava os produtos encontrados.
+
+        Args:
+            term: Termo configurado
+
+        Returns:
+            Contagem de produtos encontrados, inseridos, atualizados e inalterados
+        """
+        async with self._semaphore(term.platform):
+            started = time.perf_counter()
+            try:
+                client = get_affiliate_client(term.platform)
+                products = [
+                    product async for product in client.search_products_paginated(
+                        term.query, category=term.category, max_results=term.max_results
+                    )
+                ]
+                counts = await run_in_threadpool(_save_products, products)
+            except Exception as e:
+                logger.error(f"Error syncing '{term.query}' on {term.platform}: {e}")
+                return {"query": term.query, "platform": term.platform, "error": str(e)}
+
+            try:
+                await cache.redis.hset(self.LAST_RUN_KEY, term.key, time.time())
+            except Exception as e:
+                logger.error(f"Error recording sync schedule: {e}")
+
+            result = {
+                "query": term.query,
+                "platform": term.platform,
+                "found": len(products),
+                **counts,
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+            logger.info(f"Synced '{term.query}' on {term.platform}: {result}")
+            return result
+
+    async def run_once(self, platform: Optional[str] = None, only_due: bool = True) -> Dict[str, Any]:
+        """
+        Executa um ciclo de sincronização.
+
+        Args:
+            platform: Plataforma desejada (None para todas)
+            only_due: Se deve sincronizar apenas os termos com intervalo vencido
+
+        Returns:
+            Resumo do ciclo e o resultado de cada termo
+        """
+        started = time.perf_counter()
+        terms = get_sync_terms(platform)
+        if only_due:
+            terms = await self._due_terms(terms)
+
+        results = await asyncio.gather(*(self.sync_term(term) for term in terms))
+
+        if any(result.get("inserted") for result in results):
+            await invalidate_affiliate_stats()
+
+        summary = {
+            "terms": len(results),
+            "failed": sum(1 for result in results if "error" in result),
+            "found": sum(result.get("found", 0) for result in results),
+            "inserted": sum(result.get("inserted", 0) for result in results),
+            "updated": sum(result.get("updated", 0) for result in results),
+            "unchanged": sum(result.get("unchanged", 0) for result in results),
+            "seconds": round(time.perf_counter() - started, 2),
+            "results": results,
+        }
+        self._last_pass = {key: value for key, value in summary.items() if key != "results"}
+        return summary
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                if await self._acquire_leadership():
+                    await self._run_as_leader()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in sync scheduler pass: {e}")
+            await asyncio.sleep(settings.SYNC_SCHEDULER_TICK)
+
+    async def start(self) -> None:
+        """
+        Inicia o ciclo periódico em segundo plano.
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+            logger.info("Sync scheduler started")
+
+    async def stop(self) -> None:
+        """
+        Interrompe o ciclo periódico e libera a liderança.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            if await cache.redis.get(self.LEADER_KEY) == self.instance_id:
+                await cache.redis.delete(self.LEADER_KEY)
+        except Exception as e:
+            logger.error(f"Error releasing sync scheduler leadership: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retorna o estado do agendador e o resumo do último ciclo.
+        """
+        return {
+            "running": self._task is not None,
+            "last_pass": self._last_pass,
+        }
+
+
+# Instância global do agendador de sincronização
+sync_scheduler = SyncScheduler()
@@ -0,0 +1,323 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem lock entre processos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Semente fixa: todos os processos usam os mesmos hiperplanos do LSH
+LSH_SEED = 20240601
+
+INITIAL_CAPACITY = 1024
+
+
+class VectorIndex:
+    """
+    Índice vetorial local para busca por similaridade de cosseno em CPU.
+
+    Os vetores (float32, normalizados) ficam em uma matriz mapeada em memória
+    no disco, junto com os IDs dos produtos e as assinaturas LSH (hiperplanos
+    aleatórios, `tables` tabelas de `bits` bits). A busca filtra candidatos
+    que caem no mesmo bucket da consulta (ou a um bit de distância) em alguma
+    tabela e ordena apenas esses pelo produto interno, em lotes vetorizados.
+    Índices pequenos são pesquisados de forma exata.
+
+    Atualizações são incrementais e protegidas por um lock de arquivo; outros
+    processos recarregam o índice quando a versão em meta.json muda.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        dim: Optional[int] = None,
+        tables: Optional[int] = None,
+        bits: Optional[int] = None,
+    ):
+        self.directory = Path(directory or settings.VECTOR_INDEX_DIR)
+        self.dim = dim or settings.EMBEDDING_DIM
+        self.tables = tables or settings.VECTOR_LSH_TABLES
+        self.bits = bits or settings.VECTOR_LSH_BITS
+
+        rng = np.random.default_rng(LSH_SEED)
+        self._planes = rng.standard_normal((self.tables * self.bits, self.dim)).astype(np.float32)
+        self._bit_weights = (1 << np.arange(self.bits)).astype(np.uint32)
+
+        self._lock = threading.RLock()
+        self._version: Optional[str] = None
+        self._meta_mtime: Optional[int] = None
+        self._count = 0
+        self._capacity = 0
+        self._vectors: Optional[np.memmap] = None
+        self._ids: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._rows: Optional[Dict[int, int]] = None
+
+    # Arquivos
+
+    @property
+    def _meta_path(self) -> Path:
+        return self.directory / "meta.json"
+
+    def _open(self, name: str, dtype, shape: Tuple[int, ...], mode: str) -> np.memmap:
+        return np.memmap(self.directory / name, dtype=dtype, mode=mode, shape=shape)
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self._meta_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self) -> None:
+        self._version = uuid.uuid4().hex
+        meta = {
+            "version": self._version,
+            "dim": self.dim,
+            "tables": self.tables,
+            "bits": self.bits,
+            "count": self._count,
+            "capacity": self._capacity,
+        }
+        tmp_path = self._meta_path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _map_files(self, capacity: int, mode: str) -> None:
+        self._vectors = self._open("vectors.f32", np.float32, (capacity, self.dim), mode)
+        self._ids = self._open("ids.i64", np.int64, (capacity,), mode)
+        self._codes = self._open("codes.u32", np.uint32, (capacity, self.tables), mode)
+        self._capacity = capacity
+
+    def _load(self) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            self._version, self._count, self._capacity = None, 0, 0
+            self._vectors = self._ids = self._codes = None
+            self._rows = None
+            return
+        if (meta["dim"], meta["tables"], meta["bits"]) != (self.dim, self.tables, self.bits):
+            raise ValueError("Vector index was built with different dimensions; rebuild it")
+        self._map_files(meta["capacity"], "r+")
+        self._count = meta["count"]
+        self._version = meta["version"]
+        self._rows = None
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self._meta_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and mtime == self._meta_mtime:
+            return
+        self._meta_mtime = mtime
+        meta = self._read_meta()
+        version = meta["version"] if meta else None
+        if version != self._version or (meta is None and self._vectors is not None):
+            self._load()
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(self._capacity, INITIAL_CAPACITY)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, row_bytes in (
+            ("vectors.f32", self.dim * 4),
+            ("ids.i64", 8),
+            ("codes.u32", self.tables * 4),
+        ):
+            with open(self.directory / name, "ab") as f:
+                f.truncate(capacity * row_bytes)
+        old_capacity = self._capacity
+        self._map_files(capacity, "r+")
+        # Linhas novas começam vazias (ID -1)
+        self._ids[old_capacity:capacity] = -1
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.directory / ".lock", "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # LSH
+
+    def signatures(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Calcula as assinaturas LSH (um código por tabela) de cada vetor.
+        """
+        projected = (vectors @ self._planes.T) > 0
+        projected = projected.reshape(len(vectors), self.tables, self.bits)
+        return (projected * self._bit_weights).sum(axis=2).astype(np.uint32)
+
+    def _probe_codes(self, code: int) -> np.ndarray:
+        # Bucket da consulta e os vizinhos a um bit de distância (multi-probe)
+        return np.array([code] + [code ^ (1 << bit) for bit in range(self.bits)], dtype=np.uint32)
+
+    # Atualização
+
+    def upsert(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Insere ou substitui os vetores dos produtos informados.
+
+        Args:
+            ids: IDs dos produtos
+            vectors: Matriz float32 (len(ids), dim) normalizada
+        """
+        if len(ids) == 0:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        codes = self.signatures(vectors)
+
+        with self._write_lock():
+            self._refresh()
+            if self._rows is None:
+                self._rows = {}
+                if self._count:
+                    active = np.flatnonzero(self._ids[:self._count] >= 0)
+                    self._rows = dict(zip(self._ids[active].tolist(), active.tolist()))
+
+            rows = []
+            for product_id in ids:
+                row = self._rows.get(product_id)
+                if row is None:
+                    row = self._count
+                    self._count += 1
+                    self._rows[product_id] = row
+                rows.append(row)
+
+            self._grow(self._count)
+            rows = np.asarray(rows)
+            self._vectors[rows] = vectors
+            self._codes[rows] = codes
+            self._ids[rows] = np.asarray(ids, dtype=np.int64)
+            for array in (self._vectors, self._codes, self._ids):
+                array.flush()
+            self._write_meta()
+
+    def remove(self, ids: Sequence[int]) -> None:
+        """
+        Remove produtos do índice (as linhas ficam vazias até a reconstrução).
+        """
+        with self._write_lock():
+            self._refresh()
+            if not self._count:
+                return
+            mask = np.isin(self._ids[:self._count], np.asarray(ids, dtype=np.int64))
+            self._ids[:self._count][mask] = -1
+            self._ids.flush()
+            self._rows = None
+            self._write_meta()
+
+    def clear(self) -> None:
+        """
+        Apaga o índice (usado antes de uma reconstrução completa).
+        """
+        with self._write_lock():
+            self._vectors = self._ids = self._codes = None
+            for name in ("vectors.f32", "ids.i64", "codes.u32", "meta.json"):
+                try:
+                    os.remove(self.directory / name)
+                except FileNotFoundError:
+                    pass
+            self._version, self._count, self._capacity, self._rows = None, 0, 0, None
+            self._meta_mtime = None
+
+    # Busca
+
+    @staticmethod
+    def _top_k(vectors: np.ndarray, rows: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        # Pontua em lotes para limitar a memória temporária
+        batch_size = settings.VECTOR_SCORE_BATCH_SIZE
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            scores = vectors[batch] @ query
+            rows_batch = np.concatenate([best_rows, batch])
+            scores = np.concatenate([best_scores, scores])
+            if len(scores) > k:
+                keep = np.argpartition(-scores, k - 1)[:k]
+                rows_batch, scores = rows_batch[keep], scores[keep]
+            best_rows, best_scores = rows_batch, scores
+        order = np.argsort(-best_scores, kind="stable")
+        return best_rows[order], best_scores[order]
+
+    def search(self, query: np.ndarray, k: int = 10, exact: Optional[bool] = None) -> List[Tuple[int, float]]:
+        """
+        Busca os produtos mais parecidos com o vetor da consulta.
+
+        Args:
+            query: Vetor float32 (dim,) normalizado
+            k: Número de resultados
+            exact: Força a busca exata (True) ou aproximada (False);
+                por padrão, exata para índices pequenos
+
+        Returns:
+            Pares (ID do produto, similaridade de cosseno), do mais parecido
+        """
+        with self._lock:
+            self._refresh()
+            count, vectors, ids, codes = self._count, self._vectors, self._ids, self._codes
+        if not count or k <= 0:
+            return []
+        ids = ids[:count]
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+
+        if exact is None:
+            exact = count <= settings.VECTOR_EXACT_SEARCH_MAX
+
+        rows = None
+        if not exact:
+            query_codes = self.signatures(query[None, :])[0]
+            mask = np.zeros(count, dtype=bool)
+            probed = np.zeros(1 << self.bits, dtype=bool)
+            for table in range(self.tables):
+                # Tabela de consulta por código: evita np.isin sobre todas as linhas
+                probed[:] = False
+                probed[self._probe_codes(int(query_codes[table]))] = True
+                mask |= probed[codes[:count, table]]
+            mask &= ids >= 0
+            rows = np.flatnonzero(mask)
+            if len(rows) < k:
+                # Poucos candidatos: recorre à busca exata
+                rows = None
+        if rows is None:
+            rows = np.flatnonzero(ids >= 0)
+
+        rows, scores = self._top_k(vectors, rows, query, k)
+        return [(int(ids[row]), float(score)) for row, score in zip(rows, scores)]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retorna o tamanho do índice.
+        """
+        with self._lock:
+            self._refresh()
+            active = int((self._ids[:self._count] >= 0).sum()) if self._count else 0
+            return {"rows": self._count, "active": active, "capacity": self._capacity, "dim": self.dim}
+
+
+# Instância global do índice vetorial
+vector_index = VectorIndex()
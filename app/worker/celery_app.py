@@ -0,0 +1,59 @@
+# app/worker/celery_app.py
+"""
+Aplicação Celery dos jobs em segundo plano (sincronização, importação e
+validação de links).
+
+Inicie os workers separadamente da API:
+    celery -A app.worker.celery_app worker --loglevel=info
+"""
+from typing import Any, Dict
+
+from celery import Celery
+from celery.result import AsyncResult
+
+from app.core.config import settings
+
+celery_app = Celery(
+    "casa_digital_mcp",
+    broker=settings.CELERY_BROKER_URL or settings.REDIS_URL,
+    backend=settings.CELERY_RESULT_BACKEND or settings.REDIS_URL,
+    include=["app.worker.tasks"],
+)
+
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    result_expires=settings.JOB_RESULT_TTL,
+    worker_concurrency=settings.WORKER_CONCURRENCY,
+    # Jobs são longos: um por vez por processo, confirmados só ao terminar,
+    # e devolvidos à fila se o worker cair no meio da execução
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    task_track_started=True,
+)
+
+
+def get_job_status(job_id: str) -> Dict[str, Any]:
+    """
+    Consulta o estado de um job no backend de resultados.
+
+    Jobs desconhecidos (ou já expirados) aparecem como "PENDING".
+
+    Args:
+        job_id: ID do job
+
+    Returns:
+        Estado do job, com progresso, resultado ou erro conforme o caso
+    """
+    result = AsyncResult(job_id, app=celery_app)
+    status: Dict[str, Any] = {"job_id": job_id, "status": result.state}
+
+    if result.state == "PROGRESS":
+        status["progress"] = result.info
+    elif result.state == "SUCCESS":
+        status["result"] = result.result
+    elif result.state in ("FAILURE", "RETRY"):
+        status["error"] = str(result.result)
+    return status
@@ -0,0 +1,147 @@
+# app/worker/tasks.py
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.affiliate_link_import import backfill_affiliate_links, import_affiliate_links, revalidate_affiliate_links
+from app.services.affiliate_service import AffiliateService
+from app.services.product_sync import bulk_upsert_products
+from app.services.stats_service import invalidate_affiliate_stats
+from app.worker.celery_app import celery_app
+
+logger = logging.getLogger(__name__)
+
+# Opções de nova tentativa comuns aos jobs (backoff exponencial com jitter)
+RETRY_OPTIONS = {
+    "max_retries": settings.JOB_MAX_RETRIES,
+    "retry_backoff": True,
+    "retry_backoff_max": settings.JOB_RETRY_BACKOFF_MAX,
+    "retry_jitter": True,
+}
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class JobError(Exception):
+    """Falha de um job que deve ser tentada novamente."""
+
+
+def _is_retryable(error: httpx.HTTPStatusError) -> bool:
+    # Limite de requisições e erros do servidor são transitórios; os demais 4xx não
+    status = error.response.status_code
+    return status == 429 or status >= 500
+
+
+def run_async(coro):
+    """
+    Executa uma corrotina no event loop persistente do processo do worker.
+
+    Os clientes globais (Redis, pools HTTP) ficam presos ao loop em que foram
+    usados pela primeira vez, então o mesmo loop é reutilizado entre os jobs.
+    """
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(bind=True, autoretry_for=(httpx.TransportError, OperationalError, JobError), **RETRY_OPTIONS)
+def sync_store_products(
+    self,
+    store_id: int,
+    query: str,
+    category: Optional[str] = None,
+    limit: int = 50,
+) -> Dict[str, Any]:
+    """
+    Busca produtos em uma loja afiliada e sincroniza com o banco de dados.
+    """
+    self.update_state(state="PROGRESS", meta={"step": "searching"})
+    try:
+        # Os clientes do registro propagam os erros HTTP, em vez de devolver []
+        products = run_async(AffiliateService().search_products(
+            store_id=store_id,
+            query=query,
+            category=category,
+            limit=limit,
+        ))
+    except httpx.HTTPStatusError as e:
+        if _is_retryable(e):
+            raise JobError(str(e)) from e
+        raise
+
+    self.update_state(state="PROGRESS", meta={"step": "saving", "found": len(products)})
+    db = SessionLocal()
+    try:
+        counts = bulk_upsert_products(db, products, affiliate_store_id=store_id)
+    finally:
+        db.close()
+
+    if counts["inserted"]:
+        run_async(invalidate_affiliate_stats())
+    logger.info(f"Products synchronized for store {store_id}: {counts}")
+    return {"store_id": store_id, "found": len(products), **counts}
+
+
+@celery_app.task(bind=True, autoretry_for=(JobError,), **RETRY_OPTIONS)
+def import_affiliate_links_file(self, path: str) -> Dict[str, Any]:
+    """
+    Importa links de afiliado de um CSV salvo em UPLOAD_DIR.
+
+    A importação é idempotente (apenas UPDATEs), então pode ser repetida
+    inteira em caso de falha. O arquivo é mantido apenas enquanto houver uma
+    nova tentativa agendada; em qualquer outro desfecho, é removido.
+    """
+    def report(progress: Dict[str, Any]):
+        self.update_state(state="PROGRESS", meta=progress)
+
+    retrying = False
+    try:
+        with open(path, "rb") as fileobj:
+            progress = import_affiliate_links(fileobj, on_progress=report)
+        run_async(invalidate_affiliate_stats())
+
+        if progress["status"] == "failed" and self.request.retries < self.max_retries:
+            retrying = True
+            raise JobError(progress.get("error", "import failed"))
+        return progress
+    finally:
+        if not retrying and os.path.exists(path):
+            os.remove(path)
+
+
+@celery_app.task(bind=True, autoretry_for=(OperationalError,), **RETRY_OPTIONS)
+def validate_affiliate_links(self, platform: str) -> Dict[str, Any]:
+    """
+    Revalida os links de afiliado de uma plataforma, removendo os inválidos.
+    """
+    def report(progress: Dict[str, Any]):
+        self.update_state(state="PROGRESS", meta=progress)
+
+    result = revalidate_affiliate_links(platform, on_progress=report)
+    if result["invalid"]:
+        run_async(invalidate_affiliate_stats())
+    return {"platform": platform, **result}
+
+
+@celery_app.task(bind=True, autoretry_for=(OperationalError,), **RETRY_OPTIONS)
+def backfill_affiliate_links_job(self, platform: str) -> Dict[str, Any]:
+    """
+    Gera os links de afiliado de todos os produtos pendentes de uma plataforma.
+
+    Idempotente: produtos já convertidos deixam de ser pendentes e não são
+    processados de novo em uma nova tentativa.
+    """
+    def report(progress: Dict[str, Any]):
+        self.update_state(state="PROGRESS", meta=progress)
+
+    result = backfill_affiliate_links(platform, on_progress=report)
+    if result["updated"]:
+        run_async(invalidate_affiliate_stats())
+    return {"platform": platform, **result}
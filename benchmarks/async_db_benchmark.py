@@ -0,0 +1,67 @@
+# benchmarks/async_db_benchmark.py
+"""
+Compara a vazão de consultas concorrentes com sessão síncrona e assíncrona.
+
+Simula N requisições simultâneas em um único event loop, como em um worker
+do uvicorn:
+
+- sync: `async def` usando SessionLocal (cada consulta bloqueia o loop, então
+  as requisições são executadas uma de cada vez)
+- async: `async def` usando AsyncSessionLocal (asyncpg), consultas sobrepostas
+
+Uso:
+    python -m benchmarks.async_db_benchmark --requests 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func, select, text
+
+from app.db.session import AsyncSessionLocal, SessionLocal, async_engine
+from app.models.affiliate_store import AffiliateStore  # noqa: F401 (registra o relacionamento)
+from app.models.product import Product
+
+
+def _query(latency: float):
+    # pg_sleep simula a latência de rede/disco de uma consulta real
+    return select(func.count(Product.id), text(f"pg_sleep({latency})"))
+
+
+async def sync_request(latency: float) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(_query(latency)).all()
+    finally:
+        db.close()
+
+
+async def async_request(latency: float) -> None:
+    async with AsyncSessionLocal() as db:
+        (await db.execute(_query(latency))).all()
+
+
+async def run(name: str, request, requests: int, latency: float) -> None:
+    # Aquecimento: abre as conexões do pool antes de medir
+    await asyncio.gather(*(request(0) for _ in range(min(requests, 5))))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(latency) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:>5}: {requests} requisições em {elapsed:.2f}s ({requests / elapsed:.1f} req/s)")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50, help="Requisições concorrentes")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência simulada por consulta (segundos)")
+    args = parser.parse_args()
+
+    # O pool assíncrono padrão (5 + 10 overflow) limita a concorrência real
+    await run("sync", sync_request, args.requests, args.latency)
+    await run("async", async_request, args.requests, args.latency)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
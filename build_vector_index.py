@@ -0,0 +1,26 @@
+# build_vector_index.py
+"""
+Reconstrói o índice vetorial da busca semântica a partir de todos os produtos.
+
+Necessário na primeira instalação e após mudar EMBEDDING_DIM ou os parâmetros
+do LSH; depois disso o índice é atualizado a cada sincronização.
+
+Uso:
+    python build_vector_index.py
+"""
+import time
+
+from app.services.embedding_service import rebuild_vector_index
+from app.services.vector_index import vector_index
+
+
+def main():
+    print("=== Reconstruindo o índice vetorial ===")
+    started = time.perf_counter()
+    total = rebuild_vector_index()
+    print(f"Produtos indexados: {total} em {time.perf_counter() - started:.1f}s")
+    print(f"Índice: {vector_index.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Unique (platform, external_id) em products
+
+Revision ID: a03fa7b0f13d
+Revises: a8588558f6c6
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a03fa7b0f13d'
+down_revision: Union[str, None] = 'a8588558f6c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicados, mantendo o registro mais recente de cada produto
+    op.execute(
+        """
+        DELETE FROM products p
+        USING products d
+        WHERE p.platform = d.platform
+          AND p.external_id = d.external_id
+          AND p.id < d.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_products_platform_external_id', 'products', ['platform', 'external_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_products_platform_external_id', 'products', type_='unique')
@@ -0,0 +1,29 @@
+"""Coluna content_hash em products
+
+Revision ID: c5e1d2f4a9b7
+Revises: a03fa7b0f13d
+Create Date: 2026-10-17 14:05:12.527391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1d2f4a9b7'
+down_revision: Union[str, None] = 'a03fa7b0f13d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Produtos existentes ficam com NULL e recebem o hash na próxima sincronização
+    op.add_column('products', sa.Column('content_hash', sa.String(length=40), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'content_hash')
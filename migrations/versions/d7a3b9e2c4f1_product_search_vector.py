@@ -0,0 +1,48 @@
+"""Busca textual em products (tsvector em português + índice GIN)
+
+Revision ID: d7a3b9e2c4f1
+Revises: c5e1d2f4a9b7
+Create Date: 2026-10-17 15:32:48.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3b9e2c4f1'
+down_revision: Union[str, None] = 'c5e1d2f4a9b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('portuguese', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(brand, '')), 'B') || "
+    "setweight(to_tsvector('portuguese', coalesce(description, '')), 'C')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'products',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_products_search_vector', 'products', ['search_vector'],
+        unique=False, postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_search_vector', table_name='products', postgresql_using='gin')
+    op.drop_column('products', 'search_vector')
@@ -0,0 +1,43 @@
+"""Busca aproximada por título (pg_trgm + unaccent)
+
+Revision ID: e2f8c6a1b3d5
+Revises: d7a3b9e2c4f1
+Create Date: 2026-10-17 16:48:03.215770
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2f8c6a1b3d5'
+down_revision: Union[str, None] = 'd7a3b9e2c4f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # unaccent() é STABLE; índices exigem uma função IMMUTABLE com dicionário fixo
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION immutable_unaccent(text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_products_title_trgm ON products "
+        "USING gin (lower(immutable_unaccent(title)) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS ix_products_title_trgm")
+    op.execute("DROP FUNCTION IF EXISTS immutable_unaccent(text)")
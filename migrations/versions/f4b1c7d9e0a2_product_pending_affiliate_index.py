@@ -0,0 +1,31 @@
+"""Índice parcial para a paginação dos produtos sem link de afiliado
+
+Revision ID: f4b1c7d9e0a2
+Revises: e2f8c6a1b3d5
+Create Date: 2026-10-17 18:05:41.562309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b1c7d9e0a2'
+down_revision: Union[str, None] = 'e2f8c6a1b3d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_products_pending_affiliate', 'products', ['platform', 'id'],
+        unique=False, postgresql_where=sa.text('affiliate_url IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_products_pending_affiliate', table_name='products')